@@ -1,53 +1,237 @@
 """Integrarea INFP pentru Home Assistant."""
 import logging
+import time
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import config_validation as cv
-from .const import DOMAIN, PLATFORMS
+from homeassistant.helpers.aiohttp_client import (
+    async_create_clientsession,
+    async_get_clientsession,
+)
+from homeassistant.util import dt as dt_util
+
+from .alerts import AlertEngine
+from .api import FetchCache, InfProApiClient
+from .const import (
+    ALERT_MAX_DISTANCE,
+    ALERT_MIN_INTENSITY,
+    ALERT_MIN_MAG,
+    DOMAIN,
+    FAST_WINDOW,
+    FETCH_TIMEOUT,
+    MAX_INTERVAL,
+    MIN_INTERVAL,
+    PLATFORMS,
+    PROXIMITY_DAYS,
+    PROXIMITY_MIN_MAG,
+    PROXIMITY_RADIUS,
+    REPLAY_INTERVAL,
+    SERVICE_CAUTA_EVENIMENTE,
+    SERVICE_IMPORT_HISTORY,
+    SERVICE_REPLAY,
+    SETUP_TIME_BUDGET,
+    TRANSPORT_POLLING,
+    TRANSPORT_SSE,
+    UPDATE_INTERVAL,
+)
 from .coordinator import InfProDataUpdateCoordinator
+from .history import EventHistory
+from .metrics import InfProMetrics, create_trace_config
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
+CAUTA_EVENIMENTE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("latitudine"): cv.latitude,
+        vol.Optional("longitudine"): cv.longitude,
+        vol.Optional("raza_km", default=PROXIMITY_RADIUS): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional("zile", default=PROXIMITY_DAYS): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional("magnitudine_minima", default=PROXIMITY_MIN_MAG): vol.Coerce(float),
+        vol.Optional("limita", default=50): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Configurează integrarea folosind un config entry."""
-    _LOGGER.debug("Inițiere configurare pentru integrarea INFP.")
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    vol.All(
+        {
+            vol.Exclusive("fisier", "sursa"): cv.string,
+            vol.Exclusive("url", "sursa"): cv.url,
+        },
+        cv.has_at_least_one_key("fisier", "url"),
+    )
+)
+
+REPLAY_SCHEMA = vol.Schema(
+    {
+        vol.Required("director"): cv.string,
+        vol.Optional("viteza", default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("interval", default=REPLAY_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
 
-    # Inițializare stocare date pentru domeniu
-    hass.data.setdefault(DOMAIN, {})
 
-    # Preluare interval de actualizare
-    update_interval = entry.options.get("UPDATE_INTERVAL", 30)
+def _create_coordinator(hass: HomeAssistant, entry: ConfigEntry):
+    """Creează clientul API și coordonatorul pe baza setărilor din config entry."""
+    # Preluare intervale de actualizare (opțiunile au prioritate față de date)
+    settings = {**entry.data, **entry.options}
+    update_interval = settings.get("update_interval", UPDATE_INTERVAL)
     _LOGGER.debug(
         "Intervalul de actualizare setat pentru coordonator: %s secunde.", update_interval
     )
 
+    # Client API de lungă durată; descărcările trec prin stratul single-flight
+    # comun, care supraviețuiește reîncărcărilor. Sesiunea proprie (keep-alive)
+    # are un TraceConfig care măsoară DNS, conectarea și timpul până la primul octet.
+    fetch_cache = hass.data[DOMAIN].get("fetch_cache")
+    if fetch_cache is None:
+        metrics = InfProMetrics()
+        session = async_create_clientsession(
+            hass, trace_configs=[create_trace_config(metrics)]
+        )
+        fetch_cache = hass.data[DOMAIN]["fetch_cache"] = FetchCache(
+            session, metrics=metrics
+        )
+    api = InfProApiClient(
+        async_get_clientsession(hass),
+        fetch_cache=fetch_cache,
+        timeout=settings.get("timeout_cerere", FETCH_TIMEOUT),
+    )
+
+    # Surse suplimentare (EMSC/USGS GeoJSON, fișiere locale), interogate în
+    # paralel cu oglinda INFP; fără ele se folosește direct clientul INFP, iar
+    # modulul surselor nu este importat
+    multi_source = None
+    if settings.get("surse_suplimentare"):
+        from .sources import MultiSourceClient, create_sources
+
+        sources = create_sources(
+            hass, async_get_clientsession(hass), settings["surse_suplimentare"]
+        )
+        if sources:
+            _LOGGER.debug(
+                "Surse suplimentare configurate: %s", [source.name for source in sources]
+            )
+            api = multi_source = MultiSourceClient(api, sources)
+
+    # Punctele pentru estimarea locală a impactului: zona „home” și punctele
+    # configurate; fără niciun punct, modulul de impact nu este importat
+    impact_sites = None
+    has_home = hass.config.latitude is not None and hass.config.longitude is not None
+    if has_home or settings.get("puncte_monitorizate"):
+        from .impact import build_site_table
+
+        impact_sites = build_site_table(hass, settings.get("puncte_monitorizate"))
+
+    # Istoricul evenimentelor (fișier JSONL + deque în memorie)
+    history = EventHistory(hass)
+
+    # Motorul de alerte, cu pragurile aplicate fiecărui oraș monitorizat
+    alerts = AlertEngine(
+        hass,
+        None if settings.get("toate_orasele") else settings.get("oras_ids", []),
+        min_magnitude=settings.get("alerta_magnitudine", ALERT_MIN_MAG),
+        max_distance=settings.get("alerta_distanta", ALERT_MAX_DISTANCE),
+        min_intensity=settings.get("alerta_intensitate", ALERT_MIN_INTENSITY),
+    )
+
     # Creare coordonator
     _LOGGER.debug("Inițializare coordonator pentru integrarea INFP.")
     coordinator = InfProDataUpdateCoordinator(
-        hass, update_interval=update_interval
+        hass,
+        update_interval=update_interval,
+        api=api,
+        min_interval=settings.get("min_interval", MIN_INTERVAL),
+        max_interval=settings.get("max_interval", MAX_INTERVAL),
+        fast_window=settings.get("fast_window", FAST_WINDOW),
+        history=history,
+        impact_sites=impact_sites,
+        alerts=alerts,
     )
 
-    # Prima actualizare a datelor
-    try:
-        await coordinator.async_config_entry_first_refresh()
-        _LOGGER.debug("Prima actualizare a datelor realizată cu succes.")
-    except Exception as err:
-        _LOGGER.error("Eroare la prima actualizare a datelor: %s", err)
-        return False
+    if multi_source is not None:
+        # Prima sursă care raportează un cutremur nou îl publică imediat
+        multi_source.set_publisher(coordinator.async_push_payload)
+
+    # Transportul de ingestie: implicit doar interogarea periodică a
+    # coordonatorului (fără transport); modulul fluxului SSE este importat
+    # doar dacă fluxul este configurat
+    transport = None
+    if settings.get("transport", TRANSPORT_POLLING) == TRANSPORT_SSE:
+        from .transport import create_transport
+
+        transport = create_transport(coordinator, async_get_clientsession(hass), settings)
+    return coordinator, api, transport
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Configurează integrarea folosind un config entry."""
+    _LOGGER.debug("Inițiere configurare pentru integrarea INFP.")
+    start = time.perf_counter()
+
+    # Inițializare stocare date pentru domeniu
+    hass.data.setdefault(DOMAIN, {})
+
+    # O singură intrare (unique_id = DOMAIN) și un singur coordonator: o singură
+    # interogare a URL_CUTREMUR, indiferent de numărul de orașe monitorizate
+    coordinator, api, transport = _create_coordinator(hass, entry)
+    await coordinator.history.async_load()
+    await coordinator.alerts.async_load()
+
+    if await coordinator.async_load_cache():
+        # Pornire rapidă din cache; actualizarea reală rulează în fundal
+        _LOGGER.debug("Date inițiale preluate din cache, actualizare în fundal.")
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_refresh_dupa_cache"
+        )
+    else:
+        # Prima actualizare a datelor
+        try:
+            await coordinator.async_config_entry_first_refresh()
+            _LOGGER.debug("Prima actualizare a datelor realizată cu succes.")
+        except Exception as err:
+            _LOGGER.error("Eroare la prima actualizare a datelor: %s", err)
+            return False
+
+    if transport is not None:
+        transport.async_start(entry)
 
     # Salvare coordonator în stocarea domeniului
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
+        "api": api,
+        "transport": transport,
     }
+    _async_register_services(hass)
+
+    # Reîncărcare automată la modificarea opțiunilor
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     # Încărcare platforme asociate
     _LOGGER.debug("Încărcare platforme: %s.", PLATFORMS)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    _LOGGER.debug("Integrarea INFP a fost configurată cu succes.")
+
+    durata = time.perf_counter() - start
+    coordinator.metrics.setup_seconds = durata
+    if durata > SETUP_TIME_BUDGET:
+        _LOGGER.warning(
+            "Configurarea integrării INFP a durat %.3f secunde, peste bugetul de %s secunde.",
+            durata,
+            SETUP_TIME_BUDGET,
+        )
+    else:
+        _LOGGER.debug("Integrarea INFP a fost configurată cu succes în %.3f secunde.", durata)
     return True
 
 
@@ -59,6 +243,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         # Eliminare coordonator din stocare
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        if entry_data["transport"] is not None:
+            await entry_data["transport"].async_stop()
+        entry_data["coordinator"].alerts.async_shutdown()
+        hass.services.async_remove(DOMAIN, SERVICE_CAUTA_EVENIMENTE)
+        hass.services.async_remove(DOMAIN, SERVICE_IMPORT_HISTORY)
+        hass.services.async_remove(DOMAIN, SERVICE_REPLAY)
         _LOGGER.debug(
             "Coordonatorul a fost eliminat din stocare pentru intrarea cu ID-ul: %s.",
             entry.entry_id,
@@ -66,3 +257,204 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     _LOGGER.debug("Integrarea INFP a fost dezinstalată cu succes.")
     return unload_ok
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """
+    Migrează config entry-urile vechi (un oraș per intrare) la o singură intrare.
+
+    Prima intrare a domeniului devine intrarea unică, cu lista de orașe;
+    celelalte își mută orașul în ea și sunt eliminate.
+    """
+    _LOGGER.debug("Migrare config entry de la versiunea %s.", entry.version)
+
+    if entry.version == 1:
+        principala = hass.config_entries.async_entries(DOMAIN)[0]
+        if principala.entry_id != entry.entry_id:
+            _merge_cities(hass, principala, _entry_cities(entry))
+            hass.async_create_task(hass.config_entries.async_remove(entry.entry_id))
+            _LOGGER.info(
+                "Intrarea „%s” a fost comasată în „%s” și va fi eliminată.",
+                entry.title,
+                principala.title,
+            )
+            # Intrarea comasată nu mai este configurată
+            return False
+
+        data = {**entry.data}
+        options = {**entry.options}
+        for values in (data, options):
+            oras_id = _legacy_oras_id(values)
+            if oras_id is not None or "oras_ids" in values:
+                # `oras_ids` poate conține deja orașele intrărilor comasate
+                oras_ids = list(values.get("oras_ids", []))
+                if oras_id is not None and oras_id not in oras_ids:
+                    oras_ids.insert(0, oras_id)
+                values["oras_ids"] = oras_ids
+                values.setdefault("toate_orasele", False)
+
+        hass.config_entries.async_update_entry(
+            entry, data=data, options=options, unique_id=DOMAIN, version=2
+        )
+        _LOGGER.debug("Config entry migrat la versiunea 2: %s.", data)
+
+    return True
+
+
+def _entry_cities(entry: ConfigEntry):
+    """Orașele monitorizate de o intrare (versiunea 1 sau 2)."""
+    values = {**entry.data, **entry.options}
+    oras_id = _legacy_oras_id(values)
+    oras_ids = list(values.get("oras_ids", []))
+    if oras_id is not None and oras_id not in oras_ids:
+        oras_ids.append(oras_id)
+    return oras_ids
+
+
+def _merge_cities(hass: HomeAssistant, entry: ConfigEntry, oras_ids) -> None:
+    """Adaugă orașele unei intrări comasate în lista intrării principale."""
+    # Lista efectivă este cea din opțiuni, dacă acolo a fost aleasă
+    target = "options" if {"oras_id", "oras_ids"} & set(entry.options) else "data"
+    values = {**getattr(entry, target)}
+    existente = list(values.get("oras_ids", []))
+    values["oras_ids"] = existente + [oras_id for oras_id in oras_ids if oras_id not in existente]
+    hass.config_entries.async_update_entry(entry, **{target: values})
+    _LOGGER.debug("Orașe comasate în intrarea %s: %s.", entry.entry_id, values["oras_ids"])
+
+
+def _legacy_oras_id(values):
+    """
+    Extrage orașul unei intrări din versiunea 1 (`oras_id`, `oras_nume`).
+
+    Dacă ID-ul lipsește sau nu mai există în listă, orașul este regăsit după
+    nume, prin tabela nume -> ID.
+    """
+    oras_id = values.pop("oras_id", None)
+    oras_nume = values.pop("oras_nume", None)
+    if oras_nume is None:
+        return oras_id
+
+    from .orase import ORASE_BY_ID, normalize_nume, oras_id_by_nume
+
+    if oras_id not in ORASE_BY_ID:
+        oras_id = oras_id_by_nume().get(normalize_nume(oras_nume), oras_id)
+    return oras_id
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reîncarcă integrarea după modificarea opțiunilor."""
+    _LOGGER.debug("Opțiunile au fost modificate, se reîncarcă integrarea INFP.")
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _loaded_coordinator(hass: HomeAssistant):
+    """Coordonatorul intrării încărcate; eroare de validare dacă integrarea nu rulează."""
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        if isinstance(entry_data, dict) and "coordinator" in entry_data:
+            return entry_data["coordinator"]
+    raise ServiceValidationError("Integrarea INFP nu este încărcată.")
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Înregistrează serviciile de căutare, de import în istoric și de reluare."""
+
+    async def async_cauta_evenimente(call: ServiceCall) -> ServiceResponse:
+        """Returnează evenimentele din istoric aflate în raza și fereastra cerute."""
+        coordinator = _loaded_coordinator(hass)
+
+        lat = call.data.get("latitudine", hass.config.latitude)
+        lon = call.data.get("longitudine", hass.config.longitude)
+        if lat is None or lon is None:
+            raise ServiceValidationError("Nu sunt disponibile coordonatele punctului de căutare.")
+
+        since = dt_util.utcnow().timestamp() - call.data["zile"] * 86400
+        results = coordinator.history.query(
+            lat, lon, call.data["raza_km"], since, call.data["magnitudine_minima"]
+        )
+        _LOGGER.debug(
+            "Căutare evenimente în %s km de (%s, %s): %s rezultate.",
+            call.data["raza_km"],
+            lat,
+            lon,
+            len(results),
+        )
+        return {
+            "total": len(results),
+            "evenimente": [
+                {**event.as_payload(), "distanta_km": round(distance, 1)}
+                for distance, event in results[: call.data["limita"]]
+            ],
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAUTA_EVENIMENTE,
+        async_cauta_evenimente,
+        schema=CAUTA_EVENIMENTE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_import_history_service(call: ServiceCall) -> ServiceResponse:
+        """Importă un catalog istoric (fișier local sau endpoint paginat)."""
+        coordinator = _loaded_coordinator(hass)
+
+        path = call.data.get("fisier")
+        if path is not None and not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Accesul la fișierul {path} nu este permis.")
+
+        # Importat doar la prima folosire a serviciului
+        from .backfill import async_import_history
+
+        try:
+            return await async_import_history(
+                hass,
+                coordinator.history,
+                async_get_clientsession(hass),
+                path=path,
+                url=call.data.get("url"),
+            )
+        except (OSError, ValueError) as err:
+            raise ServiceValidationError(f"Importul catalogului a eșuat: {err}") from err
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_import_history_service,
+        schema=IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_replay_service(call: ServiceCall) -> ServiceResponse:
+        """Reia o cronologie de payload-uri înregistrate și raportează latențele."""
+        coordinator = _loaded_coordinator(hass)
+
+        if coordinator.replay is not None:
+            raise ServiceValidationError("O reluare este deja în curs.")
+
+        path = call.data["director"]
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Accesul la directorul {path} nu este permis.")
+
+        # Importat doar la prima folosire a serviciului
+        from .replay import ReplayRunner, load_timeline
+
+        # Marcajul este setat înainte de primul `await`: un al doilea apel
+        # concurent este refuzat de verificarea de mai sus
+        runner = coordinator.replay = ReplayRunner(hass, coordinator, speed=call.data["viteza"])
+        try:
+            snapshots = await hass.async_add_executor_job(
+                load_timeline, path, call.data["interval"]
+            )
+        except (OSError, ValueError) as err:
+            coordinator.replay = None
+            raise ServiceValidationError(f"Cronologia nu a putut fi citită: {err}") from err
+
+        return await runner.async_run(snapshots)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY,
+        async_replay_service,
+        schema=REPLAY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,195 @@
+"""Agregate pe ferestre glisante (număr, magnitudine maximă, energie, adâncime medie)."""
+from collections import deque
+import math
+
+# Ferestrele agregatelor: cheie -> durată (secunde)
+WINDOWS = {
+    "24h": 86400,
+    "7z": 7 * 86400,
+    "30z": 30 * 86400,
+    "365z": 365 * 86400,
+}
+
+
+def seismic_energy(magnitude):
+    """Energia seismică (J) din magnitudine: log10(E) = 1,5·M + 4,8 (Gutenberg–Richter)."""
+    return 10 ** (1.5 * magnitude + 4.8)
+
+
+class _MonotonicMax:
+    """Maxim pe fereastră glisantă: deque descrescător, actualizare O(1) amortizat."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self):
+        self._items = deque()
+
+    def add(self, timestamp, value):
+        if value is None:
+            return
+        while self._items and self._items[-1][1] <= value:
+            self._items.pop()
+        self._items.append((timestamp, value))
+
+    def expire(self, cutoff):
+        while self._items and self._items[0][0] < cutoff:
+            self._items.popleft()
+
+    @property
+    def value(self):
+        return self._items[0][1] if self._items else None
+
+
+class SlidingWindow:
+    """
+    Agregatele evenimentelor din ultimele `seconds` secunde.
+
+    Sumele sunt actualizate incremental la adăugare și la expirare, iar
+    maximele folosesc deque-uri monotone, deci costul este O(1) amortizat
+    per eveniment, indiferent de dimensiunea istoricului.
+    """
+
+    def __init__(self, seconds):
+        """Inițializează fereastra."""
+        self.seconds = seconds
+        self._events = deque()
+        self._max_ml = _MonotonicMax()
+        self._max_mw = _MonotonicMax()
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self.energy = 0.0
+        self._depth_sum = 0.0
+        self._depth_count = 0
+
+    def __len__(self):
+        """Numărul de evenimente din fereastră."""
+        return len(self._events)
+
+    def add(self, event):
+        """Adaugă un eveniment; evenimentele sosite în afara ordinii reconstruiesc fereastra."""
+        if event.timestamp is None:
+            return
+        if self._events and event.timestamp < self._events[-1].timestamp:
+            self.rebuild([*self._events, event])
+            return
+        self._events.append(event)
+        self._add_to_sums(event)
+
+    def _add_to_sums(self, event):
+        magnitude = event.mag_mw if event.mag_mw is not None else event.mag_ml
+        if magnitude is not None:
+            self.energy += seismic_energy(magnitude)
+        if event.depth is not None:
+            self._depth_sum += event.depth
+            self._depth_count += 1
+        self._max_ml.add(event.timestamp, event.mag_ml)
+        self._max_mw.add(event.timestamp, event.mag_mw)
+
+    def extend(self, events):
+        """Adaugă mai multe evenimente, în orice ordine; fereastra este reconstruită cel mult o dată."""
+        events = sorted(
+            (event for event in events if event.timestamp is not None),
+            key=lambda event: event.timestamp,
+        )
+        if not events:
+            return
+        if self._events and events[0].timestamp < self._events[-1].timestamp:
+            self.rebuild([*self._events, *events])
+            return
+        for event in events:
+            self._events.append(event)
+            self._add_to_sums(event)
+
+    def expire(self, now):
+        """Elimină evenimentele mai vechi decât fereastra."""
+        cutoff = now - self.seconds
+        while self._events and self._events[0].timestamp < cutoff:
+            event = self._events.popleft()
+            magnitude = event.mag_mw if event.mag_mw is not None else event.mag_ml
+            if magnitude is not None:
+                self.energy -= seismic_energy(magnitude)
+            if event.depth is not None:
+                self._depth_sum -= event.depth
+                self._depth_count -= 1
+        if not self._events:
+            # Fără erori de rotunjire acumulate când fereastra se golește
+            self._reset_sums()
+        self._max_ml.expire(cutoff)
+        self._max_mw.expire(cutoff)
+
+    def rebuild(self, events):
+        """Reconstruiește fereastra din evenimentele date (ex. după un import)."""
+        self._events = deque()
+        self._max_ml = _MonotonicMax()
+        self._max_mw = _MonotonicMax()
+        self._reset_sums()
+        for event in sorted(
+            (event for event in events if event.timestamp is not None),
+            key=lambda event: event.timestamp,
+        ):
+            self._events.append(event)
+            self._add_to_sums(event)
+
+    @property
+    def max_ml(self):
+        """Magnitudinea ML maximă din fereastră."""
+        return self._max_ml.value
+
+    @property
+    def max_mw(self):
+        """Magnitudinea Mw maximă din fereastră."""
+        return self._max_mw.value
+
+    @property
+    def mean_depth(self):
+        """Adâncimea medie (km) a evenimentelor din fereastră."""
+        return self._depth_sum / self._depth_count if self._depth_count else None
+
+    @property
+    def energy_magnitude(self):
+        """Magnitudinea echivalentă energiei cumulate (un singur eveniment cu aceeași energie)."""
+        return (math.log10(self.energy) - 4.8) / 1.5 if self.energy > 0 else None
+
+
+class WindowAggregates:
+    """Agregatele pentru toate ferestrele din `WINDOWS`, alimentate din istoric."""
+
+    def __init__(self, windows=None):
+        """Inițializează ferestrele."""
+        self.windows = {
+            key: SlidingWindow(seconds) for key, seconds in (windows or WINDOWS).items()
+        }
+
+    def add(self, event):
+        """Adaugă un eveniment în toate ferestrele."""
+        for window in self.windows.values():
+            window.add(event)
+
+    @property
+    def horizon(self):
+        """Durata celei mai lungi ferestre (secunde)."""
+        return max(window.seconds for window in self.windows.values())
+
+    def extend(self, events, now):
+        """Adaugă în bloc evenimente (ex. dintr-un import), în orice ordine."""
+        events = [event for event in events if event.timestamp is not None]
+        for window in self.windows.values():
+            cutoff = now - window.seconds
+            window.extend(event for event in events if event.timestamp >= cutoff)
+
+    def rebuild(self, events, now):
+        """Reconstruiește toate ferestrele din evenimentele date."""
+        events = list(events)
+        for window in self.windows.values():
+            cutoff = now - window.seconds
+            window.rebuild(
+                event for event in events
+                if event.timestamp is not None and event.timestamp >= cutoff
+            )
+
+    def window(self, key, now):
+        """Fereastra `key`, cu evenimentele expirate eliminate."""
+        window = self.windows[key]
+        window.expire(now)
+        return window
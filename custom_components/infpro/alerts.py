@@ -0,0 +1,197 @@
+"""Motorul de alerte pentru integrarea INFP."""
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ALERT_DURATION,
+    ALERT_MAX_DISTANCE,
+    ALERT_MIN_INTENSITY,
+    ALERT_MIN_MAG,
+    DOMAIN,
+    EVENT_EARTHQUAKE,
+    intensity_rank,
+)
+from .models import InfProPayload, normalize_oras_id
+
+_LOGGER = logging.getLogger(__name__)
+
+ALERT_STORAGE_VERSION = 1
+ALERT_STORAGE_KEY = f"{DOMAIN}_alerta"
+
+
+class AlertEngine:
+    """
+    Detectează evenimentele noi și declanșează alerta o singură dată per `smevid`.
+
+    Ultimul `smevid` văzut este persistat, astfel încât o repornire nu
+    redeclanșează alerta pentru același eveniment. Alerta se trimite pe
+    magistrala de evenimente (`infpro_earthquake`) sincron, în aceeași
+    iterație a buclei în care a sosit payload-ul.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        oras_ids,
+        min_magnitude=ALERT_MIN_MAG,
+        max_distance=ALERT_MAX_DISTANCE,
+        min_intensity=ALERT_MIN_INTENSITY,
+    ):
+        """Inițializează motorul de alerte (`oras_ids=None`: toate orașele din analiză)."""
+        self.hass = hass
+        self._oras_ids = (
+            None if oras_ids is None
+            else tuple(normalize_oras_id(oras_id) for oras_id in oras_ids)
+        )
+        self._min_magnitude = min_magnitude
+        self._max_distance = max_distance
+        self._min_intensity = intensity_rank(min_intensity) or 0
+        self._store = Store(hass, ALERT_STORAGE_VERSION, ALERT_STORAGE_KEY)
+        self.last_smevid = None
+        # `smevid`-ul ultimului eveniment care a depășit pragurile
+        self.last_alert_smevid = None
+        self.last_alert = None
+        self.active = False
+        self._cancel_reset: CALLBACK_TYPE | None = None
+        self._listeners = []
+
+    async def async_load(self):
+        """Încarcă ultimul `smevid` văzut."""
+        stored = await self._store.async_load() or {}
+        self.last_smevid = stored.get("last_smevid")
+        self.last_alert_smevid = stored.get("last_alert_smevid")
+        _LOGGER.debug("Ultimul eveniment văzut de motorul de alerte: %s", self.last_smevid)
+
+    @property
+    def state(self):
+        """Starea motorului (ultimele `smevid`-uri, ultima alertă), pentru o restaurare ulterioară."""
+        return {
+            "last_smevid": self.last_smevid,
+            "last_alert_smevid": self.last_alert_smevid,
+            "last_alert": self.last_alert,
+            "active": self.active,
+        }
+
+    @callback
+    def async_restore(self, state):
+        """Restaurează o stare obținută prin `state` (ex. după o reluare)."""
+        self.last_smevid = state["last_smevid"]
+        self.last_alert_smevid = state["last_alert_smevid"]
+        self.last_alert = state["last_alert"]
+        if self.active and not state["active"]:
+            if self._cancel_reset is not None:
+                self._cancel_reset()
+                self._cancel_reset = None
+            self.active = False
+        self._async_schedule_save()
+        self._async_notify()
+
+    @callback
+    def async_add_listener(self, update_callback):
+        """Înregistrează un ascultător pentru schimbarea stării alertei."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener():
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_process(self, data: InfProPayload):
+        """Verifică payload-ul și declanșează alerta dacă evenimentul este nou."""
+        event = data.event
+        if event is None or event.smevid == self.last_smevid:
+            return
+        if not data.analiza:
+            # Eveniment raportat întâi de o sursă externă: pragurile pe orașe
+            # se verifică abia când sosește analiza INFP pentru el
+            _LOGGER.debug("Eveniment %s fără analiză pe orașe, alerta așteaptă.", event.smevid)
+            return
+
+        first_run = self.last_smevid is None
+        self.last_smevid = event.smevid
+        if first_run:
+            # Prima rulare: evenimentul curent este doar reper, nu o alertă
+            _LOGGER.debug("Reper inițial pentru alerte: smevid=%s", event.smevid)
+            self._async_schedule_save()
+            return
+
+        magnitude = event.mag_ml if event.mag_ml is not None else event.mag_mw
+        orase = self._matching_cities(data)
+        if magnitude is None or magnitude < self._min_magnitude or not orase:
+            _LOGGER.debug(
+                "Eveniment nou (smevid=%s, M=%s) sub pragurile de alertă.",
+                event.smevid,
+                magnitude,
+            )
+            self._async_schedule_save()
+            return
+
+        self.last_alert_smevid = event.smevid
+        self.last_alert = {**event.as_payload(), "orase": orase}
+        self._async_schedule_save()
+        self.hass.bus.async_fire(EVENT_EARTHQUAKE, self.last_alert)
+        _LOGGER.debug(
+            "Alertă declanșată: smevid=%s, M=%s, %s orașe.", event.smevid, magnitude, len(orase)
+        )
+
+        self.active = True
+        if self._cancel_reset is not None:
+            self._cancel_reset()
+        self._cancel_reset = async_call_later(self.hass, ALERT_DURATION, self._async_reset)
+        self._async_notify()
+
+    def _matching_cities(self, data: InfProPayload):
+        """Orașele configurate în care evenimentul depășește pragurile de distanță și intensitate."""
+        orase = []
+        if self._oras_ids is None:
+            rows = data.analiza.values()
+        else:
+            rows = (data.analiza.get(oras_id) for oras_id in self._oras_ids)
+        for row in rows:
+            if row is None:
+                continue
+            if row.distanta_km is not None and row.distanta_km > self._max_distance:
+                continue
+            rank = intensity_rank(row.intensitate)
+            if (rank if rank is not None else 0) < self._min_intensity:
+                continue
+            orase.append({
+                "oras_id": row.oras_id,
+                "oras": row.oras,
+                "distanta_km": row.distanta_km,
+                "intensitate": row.intensitate,
+            })
+        return orase
+
+    @callback
+    def _async_reset(self, _now):
+        self._cancel_reset = None
+        self.active = False
+        self._async_notify()
+
+    @callback
+    def _async_notify(self):
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def _async_schedule_save(self):
+        self._store.async_delay_save(
+            lambda: {
+                "last_smevid": self.last_smevid,
+                "last_alert_smevid": self.last_alert_smevid,
+            },
+            1,
+        )
+
+    @callback
+    def async_shutdown(self):
+        """Anulează resetarea programată a alertei."""
+        if self._cancel_reset is not None:
+            self._cancel_reset()
+            self._cancel_reset = None
@@ -1,40 +1,285 @@
 """API pentru integrarea INFP."""
-import aiohttp
+import asyncio
 import async_timeout
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import logging
+import time
 
-from .const import URL_CUTREMUR
+from aiohttp import ClientSession, hdrs
+
+from homeassistant.util.json import json_loads
+
+from .breaker import CircuitBreaker
+from .const import FETCH_CACHE_TTL, FETCH_TIMEOUT, URL_CUTREMUR
+from .metrics import PHASE_DOWNLOAD, PHASE_PARSE, InfProMetrics
+from .models import parse_payload
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def fetch_data():
+class InfProHttpError(ValueError):
+    """Răspuns HTTP neașteptat de la API-ul INFP."""
+
+    def __init__(self, status, reason, retry_after=None):
+        """Inițializează eroarea cu statusul și eventualul `Retry-After` (secunde)."""
+        super().__init__(f"HTTP error {status}: {reason}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value):
+    """Convertește antetul `Retry-After` (secunde sau dată HTTP) în secunde."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class FetchCache:
     """
-    Obține datele de la API-ul INFP.
+    Strat single-flight, partajat la nivel de proces, pentru descărcările INFP.
 
-    :return: Datele primite de la API sub formă de dicționar.
+    Pe fiecare URL: apelanții concurenți așteaptă aceeași cerere în desfășurare,
+    iar rezultatul este păstrat `ttl` secunde, astfel încât reîmprospătările
+    venite în rafală (config entry-uri, `homeassistant.update_entity`,
+    temporizatorul coordonatorului) nu mai ajung în rețea. Validatorii HTTP
+    și ultimul payload sunt păstrați tot aici, pentru cererile condiționale.
+
+    Fiecare URL are un circuit breaker: după eșecuri repetate cererile
+    eșuează imediat, fără a mai aștepta timeout-ul, până la o probă reușită.
     """
-    _LOGGER.debug("Inițializare proces de obținere a datelor de la API-ul INFP.")
-    try:
-        async with aiohttp.ClientSession() as session:
-            # Setăm un timeout pentru cererea HTTP
-            async with async_timeout.timeout(10):  # Timeout de 10 secunde
-                _LOGGER.debug("Solicităm date de la URL: %s", URL_CUTREMUR)
 
-                async with session.get(URL_CUTREMUR) as response:
+    def __init__(
+        self,
+        session: ClientSession,
+        ttl=FETCH_CACHE_TTL,
+        metrics: InfProMetrics | None = None,
+    ):
+        """Inițializează stratul de cache."""
+        self._session = session
+        self.ttl = ttl
+        self.metrics = metrics or InfProMetrics()
+        # URL -> starea descărcării (validatori, ultimul payload, cererea în curs)
+        self._urls = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        """Contoarele cache-ului: din memorie, alăturate unei cereri în curs, din rețea."""
+        return {"hits": self.hits, "coalesced": self.coalesced, "misses": self.misses}
+
+    def _state(self, url):
+        state = self._urls.get(url)
+        if state is None:
+            state = self._urls[url] = _UrlState(url)
+        return state
+
+    def breaker(self, url):
+        """Circuit breaker-ul URL-ului."""
+        return self._state(url).breaker
+
+    def validators(self, url):
+        """Validatorii HTTP curenți (ETag, Last-Modified) pentru URL."""
+        state = self._state(url)
+        return {"etag": state.etag, "last_modified": state.last_modified}
+
+    def restore(self, url, etag=None, last_modified=None, payload=None):
+        """Restaurează validatorii și payload-ul corespunzător (ex. din cache-ul de pe disc)."""
+        state = self._state(url)
+        state.etag = etag
+        state.last_modified = last_modified
+        state.payload = payload
+        state.fetched_at = None
+
+    async def async_fetch(self, url, timeout=FETCH_TIMEOUT):
+        """
+        Returnează payload-ul curent pentru URL.
+
+        Un răspuns 304 întoarce același obiect payload ca descărcarea anterioară.
+
+        :raises CircuitOpenError: dacă circuitul URL-ului este deschis.
+        """
+        state = self._state(url)
+        if (
+            state.fetched_at is not None
+            and state.payload is not None
+            and time.monotonic() - state.fetched_at < self.ttl
+        ):
+            self.hits += 1
+            _LOGGER.debug("Payload servit din memorie (%s).", self.stats)
+            return state.payload
+
+        if state.inflight is not None:
+            self.coalesced += 1
+            _LOGGER.debug("Se așteaptă cererea deja în curs (%s).", self.stats)
+            return await asyncio.shield(state.inflight)
+
+        # Circuit deschis: eșec imediat, fără rețea
+        state.breaker.before_call()
+        self.misses += 1
+        state.inflight = asyncio.ensure_future(self._async_request(url, state, timeout))
+
+        def _done(task):
+            state.inflight = None
+            # Excepția este marcată ca preluată, chiar dacă toți apelanții au renunțat
+            if task.cancelled() or task.exception() is not None:
+                state.breaker.record_failure()
+            else:
+                state.breaker.record_success()
+
+        state.inflight.add_done_callback(_done)
+        return await asyncio.shield(state.inflight)
+
+    async def _async_request(self, url, state, timeout):
+        """Execută cererea HTTP condițională și actualizează starea URL-ului."""
+        _LOGGER.debug("Inițializare proces de obținere a datelor de la API-ul INFP.")
+
+        headers = {}
+        # Cererile condiționale au sens doar dacă avem payload-ul corespunzător
+        if state.payload is not None:
+            if state.etag:
+                headers[hdrs.IF_NONE_MATCH] = state.etag
+            if state.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = state.last_modified
+
+        metrics = self.metrics
+        metrics.requests += 1
+        try:
+            # Bugetul de timp al cererii HTTP (configurabil din opțiuni)
+            async with async_timeout.timeout(timeout):
+                _LOGGER.debug("Solicităm date de la URL: %s", url)
+
+                async with self._session.get(url, headers=headers) as response:
                     _LOGGER.debug("Răspuns primit cu status: %s", response.status)
 
+                    if response.status == 304 and state.payload is not None:
+                        _LOGGER.debug("Datele nu s-au modificat de la ultima cerere (304).")
+                        metrics.responses_304 += 1
+                        state.fetched_at = time.monotonic()
+                        return state.payload
+
                     if response.status != 200:
-                        raise ValueError(
-                            f"HTTP error {response.status}: {response.reason}"
+                        raise InfProHttpError(
+                            response.status,
+                            response.reason,
+                            _parse_retry_after(response.headers.get(hdrs.RETRY_AFTER)),
                         )
-                    
-                    data = await response.json()
+
+                    # Corpul este decodat direct din octeți și redus imediat la
+                    # înregistrări compacte; arborele JSON brut nu este păstrat
+                    start = time.perf_counter()
+                    body = await response.read()
+                    parse_start = time.perf_counter()
+                    data = parse_payload(json_loads(body))
+                    metrics.record(PHASE_DOWNLOAD, parse_start - start)
+                    metrics.record(PHASE_PARSE, time.perf_counter() - parse_start)
+                    metrics.responses_200 += 1
+                    metrics.payload_bytes = len(body)
                     #_LOGGER.debug("Date obținute de la API: %s", data)
 
+                    # Reținem validatorii doar după un răspuns parsat cu succes
+                    state.etag = response.headers.get(hdrs.ETAG)
+                    state.last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+                    state.payload = data
+                    state.fetched_at = time.monotonic()
+
                     return data
 
-    except Exception as e:
-        _LOGGER.error("Eroare la obținerea datelor de la API-ul INFP: %s", e)
-        raise
+        except Exception as e:
+            metrics.errors += 1
+            _LOGGER.error("Eroare la obținerea datelor de la API-ul INFP: %s", e)
+            raise
+
+
+class _UrlState:
+    """Starea descărcărilor pentru un URL."""
+
+    __slots__ = ("etag", "last_modified", "payload", "fetched_at", "inflight", "breaker")
+
+    def __init__(self, url):
+        self.breaker = CircuitBreaker(url)
+        self.etag = None
+        self.last_modified = None
+        self.payload = None
+        self.fetched_at = None
+        self.inflight = None
+
+
+class InfProApiClient:
+    """
+    Client HTTP de lungă durată pentru API-ul INFP.
+
+    Folosește sesiunea partajată a Home Assistant (conexiuni keep-alive) și
+    trimite cereri condiționale (`If-None-Match` / `If-Modified-Since`), astfel
+    încât un răspuns 304 să nu mai fie descărcat și parsat. Descărcările trec
+    prin `FetchCache`, care le comasează pe cele concurente.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        url: str = URL_CUTREMUR,
+        fetch_cache: FetchCache | None = None,
+        timeout=FETCH_TIMEOUT,
+    ):
+        """Inițializează clientul."""
+        self._url = url
+        self.timeout = timeout
+        self._fetch_cache = fetch_cache or FetchCache(session)
+        # Ultimul payload livrat de acest client, pentru a semnala „nemodificat”
+        self._last_payload = None
+
+    @property
+    def fetch_cache(self):
+        """Stratul single-flight folosit de client."""
+        return self._fetch_cache
+
+    @property
+    def metrics(self):
+        """Metricile descărcărilor (timpi pe faze, contoare)."""
+        return self._fetch_cache.metrics
+
+    @property
+    def breaker(self):
+        """Circuit breaker-ul URL-ului INFP."""
+        return self._fetch_cache.breaker(self._url)
+
+    @property
+    def validators(self):
+        """Validatorii HTTP curenți (ETag, Last-Modified), pentru persistență."""
+        return self._fetch_cache.validators(self._url)
+
+    def restore_validators(self, etag=None, last_modified=None, payload=None):
+        """Restaurează validatorii salvați, pentru cereri condiționale după repornire."""
+        self._fetch_cache.restore(self._url, etag, last_modified, payload)
+        self._last_payload = payload
+
+    async def async_fetch_payload(self):
+        """Payload-ul curent, inclusiv când nu s-a modificat (304 sau din memorie)."""
+        return await self._fetch_cache.async_fetch(self._url, self.timeout)
+
+    async def async_fetch_data(self):
+        """
+        Obține datele de la API-ul INFP.
 
+        :return: Payload-ul validat (InfProPayload) sau None dacă datele nu
+                 s-au modificat de la ultimul apel (304 sau payload din memorie
+                 deja livrat).
+        """
+        data = await self.async_fetch_payload()
+        if data is self._last_payload:
+            return None
+        self._last_payload = data
+        return data
@@ -0,0 +1,333 @@
+"""Importul unui catalog istoric de cutremure (CSV, QuakeML sau endpoint paginat)."""
+import csv
+from datetime import datetime, timezone
+import logging
+from xml.etree.ElementTree import iterparse
+
+import async_timeout
+import voluptuous as vol
+
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN, IMPORT_CHUNK_SIZE, IMPORT_MAX_PAGES
+from .models import EarthquakeEvent
+
+_LOGGER = logging.getLogger(__name__)
+
+STATISTIC_MAGNITUDE = f"{DOMAIN}:magnitudine"
+STATISTIC_COUNT = f"{DOMAIN}:numar_cutremure"
+
+# Numele de coloane acceptate în CSV, pentru fiecare câmp din `date_cutremur`
+CSV_COLUMNS = {
+    "smevid": ("smevid", "id", "event_id", "eventid"),
+    "local_time": ("local_time", "time", "data", "ora"),
+    "mag_ml": ("mag_ml", "ml", "magnitude", "mag", "magnitudine"),
+    "mag_mw": ("mag_mw", "mw"),
+    "elat": ("elat", "lat", "latitude", "latitudine"),
+    "elon": ("elon", "lon", "longitude", "longitudine"),
+    "depth": ("depth", "adancime"),
+    "location": ("location", "zona", "region", "place"),
+    "intensity": ("intensity", "intensitate"),
+}
+
+
+def _csv_records(path):
+    """Citește fișierul CSV rând cu rând și returnează înregistrări în formatul API."""
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        reader = csv.DictReader(file)
+        columns = {
+            key: next(
+                (name for name in (reader.fieldnames or []) if name.strip().lower() in aliases),
+                None,
+            )
+            for key, aliases in CSV_COLUMNS.items()
+        }
+        for row in reader:
+            yield {
+                key: row[column]
+                for key, column in columns.items()
+                if column is not None and row.get(column) not in (None, "")
+            }
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _preferred(elements, public_id):
+    """Elementul cu `publicID`-ul preferat sau, dacă lipsește, primul din listă."""
+    for element in elements:
+        if public_id and element.get("publicID") == public_id:
+            return element
+    return elements[0] if elements else None
+
+
+def _quakeml_event(element):
+    """Transformă un element `event` QuakeML în înregistrarea `date_cutremur`."""
+    record = {"smevid": (element.get("publicID") or "").rsplit("/", 1)[-1].rsplit("=", 1)[-1]}
+
+    # Originea și magnitudinea preferate (`preferredOriginID` / `preferredMagnitudeID`)
+    origin = _preferred(
+        element.findall("{*}origin"), (element.findtext("{*}preferredOriginID") or "").strip()
+    )
+    if origin is not None:
+        for field in origin:
+            value = field.find("{*}value")
+            if value is None:
+                continue
+            field_name = _local_name(field.tag)
+            if field_name == "time":
+                record["local_time"] = value.text
+            elif field_name == "latitude":
+                record["elat"] = value.text
+            elif field_name == "longitude":
+                record["elon"] = value.text
+            elif field_name == "depth":
+                # QuakeML exprimă adâncimea în metri
+                try:
+                    record["depth"] = float(value.text) / 1000
+                except (TypeError, ValueError):
+                    pass
+
+    magnitudes = element.findall("{*}magnitude")
+    preferred = _preferred(
+        magnitudes, (element.findtext("{*}preferredMagnitudeID") or "").strip()
+    )
+    # Magnitudinea preferată are prioritate pentru tipul ei (ML sau Mw); celălalt
+    # tip este completat din prima magnitudine de acel tip
+    for magnitude in ([preferred] if preferred is not None else []) + magnitudes:
+        value = magnitude.find("{*}mag/{*}value")
+        if value is None:
+            continue
+        kind = (magnitude.findtext("{*}type") or "").strip().lower()
+        key = "mag_mw" if kind.startswith("mw") else "mag_ml"
+        record.setdefault(key, value.text)
+
+    location = element.findtext("{*}description/{*}text")
+    if location is not None:
+        record["location"] = location
+    return record
+
+
+def _quakeml_records(path):
+    """Parcurge fișierul QuakeML incremental (`iterparse`), eveniment cu eveniment."""
+    parents = []
+    for kind, element in iterparse(path, events=("start", "end")):
+        if kind == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if _local_name(element.tag) != "event":
+            continue
+
+        yield _quakeml_event(element)
+
+        # Evenimentele procesate sunt eliberate din părinte (`eventParameters`),
+        # nu doar golite, pentru memorie constantă pe cataloage mari
+        if parents:
+            del parents[-1][:]
+        else:
+            element.clear()
+
+
+def _parse_chunks(records, counters):
+    """Transformă înregistrările în evenimente, în blocuri de `IMPORT_CHUNK_SIZE`."""
+    chunk = []
+    for record in records:
+        try:
+            chunk.append(EarthquakeEvent.from_payload(record))
+        except (vol.Invalid, ValueError):
+            counters["invalide"] += 1
+            continue
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def async_file_chunks(hass, path, counters):
+    """
+    Citește un fișier CSV sau QuakeML bloc cu bloc.
+
+    Fiecare bloc este parsat în executor și predat imediat istoricului, deci
+    catalogul nu este ținut în memorie în întregime.
+    """
+    records = (
+        _quakeml_records(path)
+        if path.lower().endswith((".xml", ".quakeml"))
+        else _csv_records(path)
+    )
+    chunks = _parse_chunks(records, counters)
+    while (chunk := await hass.async_add_executor_job(next, chunks, None)) is not None:
+        counters["citite"] += len(chunk)
+        _LOGGER.debug("Import catalog: %s evenimente citite.", counters["citite"])
+        yield chunk
+
+
+async def async_url_chunks(session, url, counters):
+    """
+    Citește un endpoint paginat, pagină cu pagină.
+
+    Fiecare pagină este o listă de înregistrări în formatul `date_cutremur`
+    sau un obiect `{"evenimente": [...], "next": "<url>"}`.
+    """
+    for _ in range(IMPORT_MAX_PAGES):
+        async with async_timeout.timeout(30):
+            async with session.get(url) as response:
+                response.raise_for_status()
+                page = json_loads(await response.read())
+
+        records = page if isinstance(page, list) else page.get("evenimente") or page.get("events") or []
+        for chunk in _parse_chunks(records, counters):
+            counters["citite"] += len(chunk)
+            yield chunk
+        url = page.get("next") if isinstance(page, dict) else None
+        _LOGGER.debug(
+            "Import catalog: %s evenimente citite, pagina următoare: %s", counters["citite"], url
+        )
+        if not url:
+            break
+
+
+def _hour_start(timestamp):
+    """Începutul orei UTC a unui timestamp."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def hourly_statistics(events, total=0):
+    """
+    Agregă evenimentele pe ore, pentru statisticile externe ale recorder-ului.
+
+    :param events: evenimentele (sau rezumatele) de la prima oră scrisă încolo.
+    :param total: suma cumulată dinaintea primei ore.
+    :return: (rânduri magnitudine cu mean/min/max, rânduri număr cu state/sum cumulat)
+    """
+    hours = {}
+    for event in events:
+        if event.timestamp is None:
+            continue
+        bucket = hours.setdefault(_hour_start(event.timestamp), [0, []])
+        bucket[0] += 1
+        magnitude = event.mag_ml if event.mag_ml is not None else event.mag_mw
+        if magnitude is not None:
+            bucket[1].append(magnitude)
+
+    magnitude_rows = []
+    count_rows = []
+    for start in sorted(hours):
+        count, magnitudes = hours[start]
+        total += count
+        count_rows.append({"start": start, "state": count, "sum": total})
+        if magnitudes:
+            magnitude_rows.append({
+                "start": start,
+                "mean": sum(magnitudes) / len(magnitudes),
+                "min": min(magnitudes),
+                "max": max(magnitudes),
+            })
+    return magnitude_rows, count_rows
+
+
+async def async_write_statistics(hass, history, first_hour):
+    """
+    Scrie incremental statisticile orare în recorder, în câte un singur lot per statistică.
+
+    Dacă evenimentele noi sunt toate după ultima statistică salvată, sunt
+    scrise doar orele de după ea, cu suma continuată din ultima statistică.
+    Altfel (evenimente mai vechi, importate ulterior), sunt rescrise orele de
+    la prima oră atinsă încolo, cu suma pornită de la numărul evenimentelor
+    anterioare din istoric.
+
+    :param first_hour: prima oră (UTC) care conține un eveniment nou.
+    :return: numărul de ore scrise.
+    """
+    # Importat doar la nevoie: recorder-ul nu este necesar pentru restul integrării
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+        get_last_statistics,
+    )
+
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, STATISTIC_COUNT, True, {"sum"}
+    )
+    last_rows = last.get(STATISTIC_COUNT)
+    first = first_hour.timestamp()
+    if last_rows and last_rows[0]["start"] < first:
+        start = last_rows[0]["start"] + 3600
+        total = last_rows[0]["sum"] or 0
+    else:
+        start = first
+        total = history.count_before(first)
+    _LOGGER.debug("Statistici scrise de la %s, cu suma inițială %s.", _hour_start(start), total)
+
+    magnitude_rows, count_rows = await hass.async_add_executor_job(
+        hourly_statistics, history.since(start), total
+    )
+
+    async_add_external_statistics(
+        hass,
+        StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name="Magnitudine cutremure (INFP)",
+            source=DOMAIN,
+            statistic_id=STATISTIC_MAGNITUDE,
+            unit_of_measurement=None,
+        ),
+        [StatisticData(**row) for row in magnitude_rows],
+    )
+    async_add_external_statistics(
+        hass,
+        StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name="Număr cutremure (INFP)",
+            source=DOMAIN,
+            statistic_id=STATISTIC_COUNT,
+            unit_of_measurement=None,
+        ),
+        [StatisticData(**row) for row in count_rows],
+    )
+    return len(count_rows)
+
+
+async def async_import_history(hass, history, session, path=None, url=None):
+    """
+    Importă un catalog istoric în istoricul INFP și în statisticile externe.
+
+    :return: rezumatul importului (evenimente citite, noi, duplicate, invalide).
+    """
+    counters = {"citite": 0, "invalide": 0}
+    if path is not None:
+        chunks = async_file_chunks(hass, path, counters)
+    else:
+        chunks = async_url_chunks(session, url, counters)
+
+    # Cel mai vechi eveniment nou: statisticile sunt scrise de la ora lui încolo
+    oldest = None
+
+    def _on_imported(events):
+        nonlocal oldest
+        for event in events:
+            if event.timestamp is not None and (oldest is None or event.timestamp < oldest):
+                oldest = event.timestamp
+
+    imported = await history.async_import(chunks, _on_imported)
+    hours = 0
+    if oldest is not None and "recorder" in hass.config.components:
+        hours = await async_write_statistics(hass, history, _hour_start(oldest))
+
+    summary = {
+        "citite": counters["citite"],
+        "importate": imported,
+        "duplicate": counters["citite"] - imported,
+        "invalide": counters["invalide"],
+        "ore_statistici": hours,
+    }
+    _LOGGER.debug("Import catalog încheiat: %s", summary)
+    return summary
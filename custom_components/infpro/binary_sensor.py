@@ -0,0 +1,90 @@
+"""Senzorul binar de alertă pentru integrarea INFP."""
+import logging
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+
+from .const import ATTRIBUTION, DOMAIN, INTENSITY_MAP
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Configurează senzorul binar de alertă."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
+    async_add_entities([AlertaCutremur(coordinator.alerts)])
+    _LOGGER.debug("Senzorul binar AlertaCutremur a fost adăugat.")
+
+
+# ------------------------------------------------------------------------
+# AlertaCutremur
+# ------------------------------------------------------------------------
+class AlertaCutremur(BinarySensorEntity):
+    """
+    Senzor binar activ după un cutremur nou care depășește pragurile de alertă.
+
+    Starea este împinsă de motorul de alerte (fără interogare); se activează
+    o singură dată per eveniment și revine după `ALERT_DURATION`.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.SAFETY
+    _attr_should_poll = False
+    _attr_attribution = ATTRIBUTION
+    # Lista orașelor poate fi lungă; rămâne doar în starea curentă
+    _unrecorded_attributes = frozenset({"Orașe afectate"})
+
+    def __init__(self, alerts):
+        """Inițializează senzorul."""
+        self._alerts = alerts
+        self._attr_name = "Alertă cutremur"
+        self._attr_unique_id = f"{DOMAIN}_alerta"
+
+    async def async_added_to_hass(self):
+        """Se abonează la schimbările motorului de alerte."""
+        self.async_on_remove(self._alerts.async_add_listener(self._handle_alert_update))
+
+    @callback
+    def _handle_alert_update(self):
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self):
+        """Returnează True cât timp alerta este activă."""
+        return self._alerts.active
+
+    @property
+    def extra_state_attributes(self):
+        """Detaliile ultimei alerte."""
+        alert = self._alerts.last_alert
+        if not alert:
+            return None
+        return {
+            "ID eveniment": alert.get("smevid"),
+            "Magnitudine (ML)": alert.get("mag_ml"),
+            "Ora locală": alert.get("local_time"),
+            "Zonă": alert.get("location"),
+            "Orașe afectate": [
+                f"{oras['oras']}: {INTENSITY_MAP.get(oras['intensitate'], 'Necunoscută')}"
+                for oras in alert.get("orase", [])
+            ],
+        }
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:alert-octagram" if self.is_on else "mdi:alert-octagram-outline"
+
+    @property
+    def device_info(self):
+        """Informații despre dispozitiv."""
+        return {
+            "identifiers": {(DOMAIN, "cutremur")},
+            "name": "Cutremur România (INFP)",
+            "manufacturer": "Institutul Național pentru Fizica Pământului",
+            "model": "Monitorizare Seisme",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
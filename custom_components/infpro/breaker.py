@@ -0,0 +1,118 @@
+"""Circuit breaker pentru descărcările INFP și sursele suplimentare."""
+import logging
+import time
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Cererea a fost refuzată imediat: circuitul este deschis."""
+
+    def __init__(self, name, retry_after=None):
+        """Inițializează eroarea cu timpul rămas până la următoarea probă (secunde)."""
+        super().__init__(f"Circuit deschis pentru {name}")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker cu trei stări.
+
+    - închis: cererile trec; după `failure_threshold` eșecuri consecutive
+      circuitul se deschide;
+    - deschis: cererile eșuează imediat (`CircuitOpenError`), fără rețea,
+      timp de `reset_timeout` secunde;
+    - semideschis: o singură cerere de probă trece; succesul închide
+      circuitul, eșecul îl redeschide cu o pauză dublată (până la plafon).
+    """
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+        max_reset_timeout=BREAKER_MAX_RESET_TIMEOUT,
+    ):
+        """Inițializează circuitul (închis)."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self._open_for = reset_timeout
+        self._opened_at = None
+        self._probing = False
+
+    def before_call(self):
+        """
+        Verifică dacă cererea poate pleca.
+
+        :raises CircuitOpenError: dacă circuitul este deschis sau o probă este deja în curs.
+        """
+        if self.state == STATE_OPEN:
+            remaining = self._opened_at + self._open_for - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, remaining)
+            self.state = STATE_HALF_OPEN
+            self._probing = False
+            _LOGGER.debug("Circuit %s semideschis: se trimite o cerere de probă.", self.name)
+
+        if self.state == STATE_HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(self.name)
+            self._probing = True
+
+    def record_success(self):
+        """Cererea a reușit: circuitul se închide."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.debug("Circuit %s închis după o cerere reușită.", self.name)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probing = False
+        self._open_for = self.reset_timeout
+
+    def record_failure(self):
+        """Cererea a eșuat: circuitul se deschide la prag sau după o probă eșuată."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._open_for = min(self._open_for * 2, self.max_reset_timeout)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = STATE_OPEN
+        self.opened += 1
+        self._probing = False
+        self._opened_at = time.monotonic()
+        _LOGGER.debug(
+            "Circuit %s deschis pentru %.0f secunde după %s eșecuri.",
+            self.name,
+            self._open_for,
+            self.failures,
+        )
+
+    def as_dict(self):
+        """Starea circuitului, pentru diagnostic."""
+        return {
+            "stare": self.state,
+            "esecuri_consecutive": self.failures,
+            "cereri_refuzate": self.rejected,
+            "deschideri": self.opened,
+            "pauza_s": self._open_for,
+        }
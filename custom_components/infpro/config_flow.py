@@ -1,63 +1,156 @@
 """Config flow pentru integrarea INFP."""
+from functools import cache
 import voluptuous as vol
 import logging
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers.selector import (
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+    TextSelector,
+    TextSelectorConfig,
+)
 
-from .const import DOMAIN, UPDATE_INTERVAL, DEFAULT_ORAS, LISTA_ORASE
+from .const import (
+    DOMAIN,
+    UPDATE_INTERVAL,
+    MIN_INTERVAL,
+    MAX_INTERVAL,
+    FAST_WINDOW,
+    FETCH_TIMEOUT,
+    PROXIMITY_RADIUS,
+    PROXIMITY_DAYS,
+    PROXIMITY_MIN_MAG,
+    ALERT_MIN_MAG,
+    ALERT_MAX_DISTANCE,
+    ALERT_MIN_INTENSITY,
+    INTENSITY_ORDER,
+    DEFAULT_ORAS,
+    TRANSPORT_POLLING,
+    TRANSPORT_SSE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _build_oras_selector(options):
+    """Selector cu selecție multiplă și căutare pentru orașe."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=list(options),
+            multiple=True,
+            mode=SelectSelectorMode.DROPDOWN,
+        )
+    )
+
+
+@cache
+def _full_oras_selector():
+    """Selectorul cu toate orașele, construit o singură dată, la prima afișare a formularului."""
+    from .orase import ORASE_BY_ID
+
+    return _build_oras_selector(
+        SelectOptionDict(value=oras_id, label=oras_nume)
+        for oras_id, oras_nume in ORASE_BY_ID.items()
+    )
+
+
+def _oras_selector(oras_ids=None):
+    """Returnează selectorul complet sau unul restrâns la orașele indicate."""
+    if oras_ids is None:
+        return _full_oras_selector()
+
+    from .orase import ORASE_BY_ID
+
+    return _build_oras_selector(
+        SelectOptionDict(value=oras_id, label=ORASE_BY_ID[oras_id])
+        for oras_id in oras_ids
+        if oras_id in ORASE_BY_ID
+    )
+
+
+def _valid_sources(text):
+    """Verifică sursele suplimentare (URL http(s) sau cale absolută, câte una pe linie)."""
+    from .sources import parse_sources
+
+    try:
+        parse_sources(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_points(text):
+    """Verifică formatul punctelor de monitorizare (`Nume: lat, lon` pe linie)."""
+    from .impact import parse_points
+
+    try:
+        parse_points(text)
+    except ValueError:
+        return False
+    return True
+
+
 class InfProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Flux de configurare pentru integrarea INFP."""
 
-    VERSION = 1
+    VERSION = 2
 
     async def async_step_user(self, user_input=None):
         """Primul pas din configurare."""
+        # Un singur config entry: toate orașele sunt servite de același coordonator
+        await self.async_set_unique_id(DOMAIN)
+        self._abort_if_unique_id_configured()
+
+        errors = {}
         if user_input is not None:
-            # Obține numele orașului bazat pe ID-ul selectat
-            oras_id = user_input["oras_id"]
-            orase = {oras.split(": ")[0]: oras.split(": ")[1] for oras in LISTA_ORASE}
-            oras_nume = orase.get(oras_id, "Necunoscut")
+            oras_ids = user_input.get("oras_ids", [])
+            toate_orasele = user_input.get("toate_orasele", False)
 
             _LOGGER.debug(
-                "Utilizatorul a selectat orașul: ID=%s, Nume oraș=%s",
-                oras_id,
-                oras_nume,
+                "Utilizatorul a selectat orașele: ID-uri=%s, Toate orașele=%s",
+                oras_ids,
+                toate_orasele,
             )
 
-            # Conversia cheii update_interval la litere mici
-            user_input = {
-                "update_interval": user_input["update_interval"],
-                "oras_id": oras_id,
-                "oras_nume": oras_nume,
-            }
+            if not oras_ids and not toate_orasele:
+                errors["base"] = "oras_invalid"
+            else:
+                # Conversia cheii update_interval la litere mici
+                user_input = {
+                    "update_interval": user_input["update_interval"],
+                    "oras_ids": oras_ids,
+                    "toate_orasele": toate_orasele,
+                }
 
-            return self.async_create_entry(
-                title=self.hass.data.get("translations", {}).get("config.title", "Cutremur România (INFP)"),
-                data=user_input,
-            )
+                return self.async_create_entry(
+                    title=self.hass.data.get("translations", {}).get("config.title", "Cutremur România (INFP)"),
+                    data=user_input,
+                )
 
         _LOGGER.debug("Inițializare formular pentru configurarea INFP.")
 
-        orase = {oras.split(": ")[0]: oras.split(": ")[1] for oras in LISTA_ORASE}
-
         schema = vol.Schema({
             vol.Required(
                 "update_interval",
                 default=UPDATE_INTERVAL
             ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+            vol.Optional(
+                "oras_ids",
+                default=[DEFAULT_ORAS]
+            ): _oras_selector(),
             vol.Required(
-                "oras_id",
-                default=DEFAULT_ORAS
-            ): vol.In(orase),
+                "toate_orasele",
+                default=False
+            ): bool,
         })
 
         return self.async_show_form(
             step_id="user",
             data_schema=schema,
+            errors=errors,
             description_placeholders={
                 "description": self.hass.data.get("translations", {}).get("config.step.user.description", "")
             }
@@ -77,42 +170,142 @@ class InfProOptionsFlow(config_entries.OptionsFlow):
         """Inițializează fluxul de opțiuni."""
         super().__init__()
         self._config_entry = config_entry
+        self._filtered_ids = None
 
     async def async_step_init(self, user_input=None):
         """Pasul inițial pentru fluxul de opțiuni."""
-        if user_input is not None:
-            # Actualizăm numele orașului la modificarea opțiunilor
-            oras_id = user_input["oras_id"]
-            orase = {oras.split(": ")[0]: oras.split(": ")[1] for oras in LISTA_ORASE}
-            oras_nume = orase.get(oras_id, "Necunoscut")
+        errors = {}
+        current = {**self._config_entry.data, **self._config_entry.options}
+
+        if user_input is not None and user_input.get("filtru_oras"):
+            from .orase import search_orase
+
+            # Filtrare după prefix: reafișăm formularul doar cu orașele potrivite,
+            # păstrând selecția curentă și celelalte valori introduse
+            filtru = user_input.pop("filtru_oras")
+            selectate = user_input.get("oras_ids", [])
+            potrivite = search_orase(filtru)
+            self._filtered_ids = list(dict.fromkeys([*selectate, *potrivite]))
+            _LOGGER.debug(
+                "Filtru orașe '%s': %s rezultate.", filtru, len(potrivite)
+            )
+            if not potrivite:
+                errors["filtru_oras"] = "oras_negasit"
+            current.update(user_input)
+            user_input = None
 
+        if user_input is not None:
+            user_input.pop("filtru_oras", None)
             _LOGGER.debug(
-                "Utilizatorul a actualizat orașul: ID=%s, Nume=%s",
-                oras_id,
-                oras_nume,
+                "Utilizatorul a actualizat orașele: ID-uri=%s, Toate orașele=%s",
+                user_input.get("oras_ids", []),
+                user_input.get("toate_orasele", False),
             )
 
-            user_input["oras_nume"] = oras_nume
-            return self.async_create_entry(title="", data=user_input)
+            if not user_input.get("oras_ids") and not user_input.get("toate_orasele"):
+                errors["base"] = "oras_invalid"
+            elif user_input["min_interval"] > user_input["max_interval"]:
+                errors["base"] = "invalid_interval_bounds"
+            elif not _valid_points(user_input.get("puncte_monitorizate")):
+                errors["puncte_monitorizate"] = "puncte_invalide"
+            elif user_input.get("transport") == TRANSPORT_SSE and not str(
+                user_input.get("stream_url") or ""
+            ).startswith(("http://", "https://")):
+                errors["stream_url"] = "stream_url_invalid"
+            elif not _valid_sources(user_input.get("surse_suplimentare")):
+                errors["surse_suplimentare"] = "surse_invalide"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         _LOGGER.debug("Inițializare formular pentru opțiunile fluxului INFP.")
 
-        orase = {oras.split(": ")[0]: oras.split(": ")[1] for oras in LISTA_ORASE}
-
         schema = vol.Schema({
             vol.Required(
                 "update_interval",
-                default=self.config_entry.options.get("update_interval", UPDATE_INTERVAL)
+                default=current.get("update_interval", UPDATE_INTERVAL)
             ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+            vol.Optional("filtru_oras"): str,
+            vol.Optional(
+                "oras_ids",
+                default=current.get("oras_ids", [DEFAULT_ORAS])
+            ): _oras_selector(self._filtered_ids),
+            vol.Required(
+                "toate_orasele",
+                default=current.get("toate_orasele", False)
+            ): bool,
+            vol.Required(
+                "min_interval",
+                default=current.get("min_interval", MIN_INTERVAL)
+            ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+            vol.Required(
+                "max_interval",
+                default=current.get("max_interval", MAX_INTERVAL)
+            ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+            vol.Required(
+                "fast_window",
+                default=current.get("fast_window", FAST_WINDOW)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                "timeout_cerere",
+                default=current.get("timeout_cerere", FETCH_TIMEOUT)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+            vol.Required(
+                "alerta_magnitudine",
+                default=current.get("alerta_magnitudine", ALERT_MIN_MAG)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Required(
+                "alerta_distanta",
+                default=current.get("alerta_distanta", ALERT_MAX_DISTANCE)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Required(
+                "alerta_intensitate",
+                default=current.get("alerta_intensitate", ALERT_MIN_INTENSITY)
+            ): SelectSelector(
+                SelectSelectorConfig(
+                    options=list(INTENSITY_ORDER),
+                    mode=SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Required(
+                "raza_proximitate",
+                default=current.get("raza_proximitate", PROXIMITY_RADIUS)
+            ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+            vol.Required(
+                "zile_proximitate",
+                default=current.get("zile_proximitate", PROXIMITY_DAYS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(
+                "magnitudine_minima",
+                default=current.get("magnitudine_minima", PROXIMITY_MIN_MAG)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                "puncte_monitorizate",
+                default=current.get("puncte_monitorizate", "")
+            ): TextSelector(TextSelectorConfig(multiline=True)),
             vol.Required(
-                "oras_id",
-                default=self.config_entry.options.get("oras_id", DEFAULT_ORAS)
-            ): vol.In(orase),
+                "transport",
+                default=current.get("transport", TRANSPORT_POLLING)
+            ): SelectSelector(
+                SelectSelectorConfig(
+                    options=[TRANSPORT_POLLING, TRANSPORT_SSE],
+                    mode=SelectSelectorMode.LIST,
+                    translation_key="transport",
+                )
+            ),
+            vol.Optional(
+                "stream_url",
+                default=current.get("stream_url", "")
+            ): str,
+            vol.Optional(
+                "surse_suplimentare",
+                default=current.get("surse_suplimentare", "")
+            ): TextSelector(TextSelectorConfig(multiline=True)),
         })
 
         return self.async_show_form(
             step_id="init",
             data_schema=schema,
+            errors=errors,
             description_placeholders={
                 "description": self.hass.data.get("translations", {}).get("config.step.init.description", "")
             }
@@ -1,27 +1,163 @@
 """Coordonator pentru integrarea INFP."""
 import asyncio
 from datetime import timedelta
+import hashlib
+import json
 import logging
+import random
+import time
 
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import fetch_data
-from .const import DOMAIN
+from .alerts import AlertEngine
+from .api import InfProApiClient, InfProHttpError
+from .breaker import CircuitOpenError
+from .history import EventHistory
+from .models import InfProPayload, parse_payload
+from .const import (
+    BACKOFF_FACTOR,
+    CACHE_SAVE_DELAY,
+    DOMAIN,
+    FAST_WINDOW,
+    MAX_INTERVAL,
+    MIN_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+CACHE_STORAGE_VERSION = 1
+CACHE_STORAGE_KEY = f"{DOMAIN}_payload"
+
+
+class AdaptiveScheduler:
+    """
+    Calculează intervalul până la următoarea interogare.
+
+    - după un `smevid` nou: interval minim pe durata ferestrei rapide;
+    - cât timp fluxul nu se schimbă: creștere geometrică până la plafon;
+    - la erori: back-off exponențial cu jitter, respectând `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        base,
+        minimum=MIN_INTERVAL,
+        maximum=MAX_INTERVAL,
+        fast_window=FAST_WINDOW,
+        factor=BACKOFF_FACTOR,
+    ):
+        """Inițializează planificatorul (toate valorile sunt în secunde)."""
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.base = min(max(base, self.minimum), self.maximum)
+        self.fast_window = fast_window
+        self.factor = factor
+        self.current = self.base
+        self._fast_until = 0.0
+        self._errors = 0
+
+    def _in_fast_window(self, now):
+        return now < self._fast_until
+
+    def on_new_event(self, now):
+        """Un eveniment nou a apărut: intrăm în regimul rapid."""
+        self._errors = 0
+        self._fast_until = now + self.fast_window
+        self.current = self.minimum
+        return self.current
+
+    def on_changed(self, now):
+        """Datele s-au schimbat, fără eveniment nou: revenim la intervalul de bază."""
+        self._errors = 0
+        self.current = self.minimum if self._in_fast_window(now) else self.base
+        return self.current
+
+    def on_unchanged(self, now):
+        """Fluxul nu s-a schimbat: creștem intervalul spre plafon."""
+        self._errors = 0
+        if self._in_fast_window(now):
+            self.current = self.minimum
+        else:
+            self.current = min(max(self.current, self.base) * self.factor, self.maximum)
+        return self.current
+
+    def reset(self):
+        """Revine la intervalul de bază, fără regim rapid și fără erori (ex. după o reluare)."""
+        self._errors = 0
+        self._fast_until = 0.0
+        self.current = self.base
+        return self.current
+
+    def on_error(self, now, retry_after=None):
+        """Eroare la interogare: back-off exponențial cu jitter."""
+        self._errors += 1
+        start = self.minimum if self._in_fast_window(now) else self.base
+        # Jitter-ul se aplică înainte de plafonare, ca intervalul să nu depășească maximul
+        delay = min(
+            start * (2 ** (self._errors - 1)) * random.uniform(0.8, 1.2), self.maximum
+        )
+        if retry_after is not None:
+            # `Retry-After` cerut explicit de server are prioritate față de plafon
+            delay = max(delay, retry_after)
+        self.current = max(delay, self.minimum)
+        return self.current
+
 
 class InfProDataUpdateCoordinator(DataUpdateCoordinator):
     """Coordonator pentru gestionarea actualizărilor de date."""
 
-    def __init__(self, hass, update_interval):
+    def __init__(
+        self,
+        hass,
+        update_interval,
+        api: InfProApiClient,
+        min_interval=MIN_INTERVAL,
+        max_interval=MAX_INTERVAL,
+        fast_window=FAST_WINDOW,
+        history: EventHistory | None = None,
+        impact_sites=None,
+        alerts: AlertEngine | None = None,
+    ):
         """Inițializează coordonatorul."""
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_data_coordinator",
             update_interval=timedelta(seconds=update_interval),
+            # Ascultătorii sunt notificați doar dacă datele s-au schimbat
+            always_update=False,
+        )
+        self.api = api
+        # Timpii fazelor și contoarele, expuse prin senzorii de diagnostic
+        self.metrics = api.metrics
+        self.history = history
+        # Estimarea locală a impactului pentru zona „home” și punctele configurate
+        # (SiteTable; None dacă nu există niciun punct)
+        self.impact_sites = impact_sites
+        self.impact = {}
+        # Motorul de alerte (evenimentul `infpro_earthquake` și senzorul binar)
+        self.alerts = alerts
+        # Amprentele secțiunilor de nivel superior din payload
+        self._section_hashes = {}
+        self.changed_sections = set()
+        self.scheduler = AdaptiveScheduler(
+            update_interval, min_interval, max_interval, fast_window
         )
+        self.update_interval = timedelta(seconds=self.scheduler.current)
+        self.last_smevid = None
+        # Cache-ul ultimului payload valid, pentru pornire rapidă
+        self._cache = Store(hass, CACHE_STORAGE_VERSION, CACHE_STORAGE_KEY)
+        self.data_fetched_at = None
+        self.is_stale = False
+        # API indisponibil: se servesc ultimele date valide, marcate ca învechite
+        self.degraded = False
+        # Un transport push conectat: interogarea periodică devine doar rezervă
+        self.push_connected = False
+        # Reluarea în curs (ReplayRunner): datele vin doar din cronologia înregistrată
+        self.replay = None
         _LOGGER.debug(
             "INFPDataUpdateCoordinator inițializat cu un interval de actualizare de %s secunde.",
             update_interval,
@@ -30,13 +166,258 @@ class InfProDataUpdateCoordinator(DataUpdateCoordinator):
     async def _async_update_data(self):
         """Actualizează datele prin API."""
         _LOGGER.debug("Inițiere proces de actualizare a datelor prin API.")
+        # Secțiunile modificate sunt calculate local: un payload livrat prin
+        # push (flux SSE sau publicare timpurie a surselor) poate fi procesat
+        # între două `await`-uri ale acestei interogări. `changed_sections` este
+        # setat doar imediat înainte de notificarea ascultătorilor, fără `await`.
+        changed = set()
+        if not self.is_stale:
+            self.always_update = False
         try:
             # Apelează API-ul pentru a obține date actualizate
-            data = await fetch_data()
-            #_LOGGER.debug("Date actualizate cu succes: %s", data)
-            return data
+            data = await self.api.async_fetch_data()
         except Exception as err:
+            # `Retry-After` (HTTP) sau timpul rămas până la proba circuitului
+            retry_after = (
+                err.retry_after if isinstance(err, (InfProHttpError, CircuitOpenError)) else None
+            )
+            self._set_next_interval(self.scheduler.on_error(time.monotonic(), retry_after))
+            if self.data is not None:
+                return self._serve_stale(err)
+            self.changed_sections = set()
             _LOGGER.error(
                 "Eroare la actualizarea datelor prin API: %s", err, exc_info=True
             )
             raise UpdateFailed(f"Eroare la actualizarea datelor: {err}")
+
+        now = time.monotonic()
+        self.data_fetched_at = dt_util.utcnow()
+        if self.is_stale:
+            # Prima actualizare reușită după pornirea din cache sau după o
+            # întrerupere: toate entitățile își recalculează starea (inclusiv
+            # eliminarea marcajului de date învechite)
+            if self.degraded:
+                _LOGGER.info("API-ul INFP răspunde din nou, datele au fost actualizate.")
+            else:
+                _LOGGER.debug("Datele din cache au fost confirmate de API.")
+            self.is_stale = False
+            self.degraded = False
+            changed = set(self._section_hashes)
+
+        if data is None:
+            # 304: păstrăm datele existente, fără parsare și fără notificări
+            _LOGGER.debug("Datele API nu s-au modificat, se păstrează cele existente.")
+            self.metrics.refreshes_unchanged += 1
+            self._set_next_interval(self.scheduler.on_unchanged(now))
+            self.changed_sections = changed
+            return self.data
+
+        return await self._async_process_payload(data, now, changed)
+
+    def _serve_stale(self, err):
+        """
+        Păstrează ultimul payload valid când API-ul este indisponibil.
+
+        Entitățile rămân disponibile; la prima eroare sunt rescrise o singură
+        dată, cu marcajul de date învechite, iar erorile următoare nu mai
+        produc scrieri de stare.
+        """
+        if isinstance(err, CircuitOpenError):
+            _LOGGER.debug("Circuit deschis, se păstrează ultimele date valide: %s", err)
+        elif self.degraded:
+            _LOGGER.debug("API-ul INFP este în continuare indisponibil: %s", err)
+        else:
+            _LOGGER.warning(
+                "API-ul INFP nu răspunde (%s); se păstrează ultimele date valide.", err
+            )
+
+        changed = set()
+        if not self.degraded:
+            self.degraded = True
+            self.is_stale = True
+            self.always_update = True
+            changed = set(self._section_hashes)
+        self.changed_sections = changed
+        return self.data
+
+    async def async_push_payload(self, data: InfProPayload):
+        """
+        Publică imediat un payload livrat de un transport push (ex. flux SSE).
+
+        Payload-ul trece prin aceeași detectare a modificărilor ca la
+        interogare; ascultătorii sunt notificați doar dacă ceva s-a schimbat.
+        """
+        if self.replay is not None:
+            _LOGGER.debug("Reluare în curs, payload-ul livrat prin push este ignorat.")
+            return
+        changed = set()
+        self.data_fetched_at = dt_util.utcnow()
+        if self.is_stale:
+            self.is_stale = False
+            self.degraded = False
+            self.always_update = False
+            changed = set(self._section_hashes)
+        previous = self.data
+        data = await self._async_process_payload(data, time.monotonic(), changed)
+        if data is not previous:
+            self.async_set_updated_data(data)
+
+    @callback
+    def set_push_connected(self, connected, refresh=True):
+        """
+        Marchează starea transportului push și ajustează interogarea de rezervă.
+
+        La deconectare se cere o interogare imediată, pentru a nu pierde
+        evenimente cât timp fluxul se reconectează.
+        """
+        if connected == self.push_connected:
+            return
+        self.push_connected = connected
+        _LOGGER.debug("Transport push %s.", "conectat" if connected else "deconectat")
+        self._set_next_interval(self.scheduler.current)
+        if not connected and refresh:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    async def _async_process_payload(self, data: InfProPayload, now, changed):
+        """
+        Detectează modificările unui payload nou și actualizează starea derivată.
+
+        `changed` conține secțiunile deja marcate de apelant (ex. la ieșirea
+        din starea învechită). La return, `changed_sections` este setat fără
+        niciun `await` până la notificarea ascultătorilor de către apelant.
+        """
+        changed |= self._detect_changed_sections(data)
+        if not changed and self.data is not None:
+            _LOGGER.debug("Conținutul payload-ului este identic, se păstrează datele existente.")
+            self.metrics.refreshes_unchanged += 1
+            self._set_next_interval(self.scheduler.on_unchanged(now))
+            self.changed_sections = changed
+            return self.data
+
+        self.metrics.refreshes_changed += 1
+        if self.alerts is not None and changed & {"date_cutremur", "analiza_cutremur"}:
+            # Sincron, înainte de orice `await`: alerta pleacă în aceeași iterație
+            self.alerts.async_process(data)
+        if "date_cutremur" in changed:
+            self.impact = self._estimate_impact(data.event)
+            await self._async_record_event(data.event)
+
+        smevid = data.event.smevid if data.event else None
+        if self.last_smevid is not None and smevid != self.last_smevid:
+            _LOGGER.debug("Eveniment nou detectat (smevid=%s), regim rapid activat.", smevid)
+            self._set_next_interval(self.scheduler.on_new_event(now))
+        else:
+            self._set_next_interval(self.scheduler.on_changed(now))
+        self.last_smevid = smevid
+
+        _LOGGER.debug("Secțiuni modificate: %s", sorted(changed))
+        #_LOGGER.debug("Date actualizate cu succes: %s", data)
+        self._async_schedule_cache_save(data)
+        self.changed_sections = changed
+        return data
+
+    async def async_load_cache(self):
+        """
+        Încarcă ultimul payload salvat și îl publică imediat, marcat ca învechit.
+
+        :return: True dacă a existat un payload în cache.
+        """
+        cached = await self._cache.async_load()
+        if not cached or not isinstance(cached.get("data"), dict):
+            _LOGGER.debug("Nu există un payload salvat în cache.")
+            return False
+
+        data = parse_payload(cached["data"])
+        self.api.restore_validators(cached.get("etag"), cached.get("last_modified"), data)
+        self.data_fetched_at = dt_util.parse_datetime(cached.get("fetched_at") or "")
+        self.changed_sections = self._detect_changed_sections(data)
+        self.impact = self._estimate_impact(data.event)
+        self.last_smevid = data.event.smevid if data.event else None
+
+        # Până la prima actualizare reușită datele sunt marcate ca învechite,
+        # iar ascultătorii vor fi notificați chiar dacă payload-ul nu diferă
+        self.is_stale = True
+        self.always_update = True
+        self.async_set_updated_data(data)
+        _LOGGER.debug(
+            "Pornire din cache: payload descărcat la %s.", self.data_fetched_at
+        )
+        return True
+
+    def _async_schedule_cache_save(self, payload: InfProPayload):
+        """Programează salvarea (cu întârziere) a payload-ului în cache."""
+        if self.replay is not None:
+            # Payload-urile reluate nu înlocuiesc cache-ul folosit la pornire
+            return
+        fetched_at = self.data_fetched_at
+        validators = self.api.validators
+
+        def _data_to_save():
+            return {
+                "data": payload.sections(),
+                "fetched_at": fetched_at.isoformat() if fetched_at else None,
+                **validators,
+            }
+
+        self._cache.async_delay_save(_data_to_save, CACHE_SAVE_DELAY)
+
+    async def _async_record_event(self, event):
+        """Adaugă evenimentul curent în istoric, dacă `smevid` este nou."""
+        if self.history is None or event is None:
+            return
+        if self.replay is not None:
+            # Evenimentele reluate nu ajung în istoricul persistent
+            return
+        try:
+            await self.history.async_add(event)
+        except OSError as err:
+            _LOGGER.error("Eroare la salvarea evenimentului în istoric: %s", err)
+
+    def _set_next_interval(self, seconds):
+        """Setează intervalul folosit la programarea următoarei interogări."""
+        if self.push_connected:
+            # Datele sosesc prin flux; interogăm rar, doar pentru verificare
+            seconds = max(seconds, self.scheduler.maximum)
+        self.update_interval = timedelta(seconds=seconds)
+        _LOGGER.debug("Următoarea interogare peste %.1f secunde.", seconds)
+
+    def section_changed(self, section):
+        """Returnează True dacă secțiunea s-a modificat la ultima actualizare."""
+        return section in self.changed_sections
+
+    @property
+    def analiza_by_oras(self):
+        """
+        Indexul oras_id normalizat -> AnalizaRow al payload-ului curent.
+
+        Este construit de `parse_payload` la fiecare răspuns 200 (sau payload
+        primit prin push), indiferent dacă `analiza_cutremur` s-a schimbat;
+        un 304 păstrează indexul existent.
+        """
+        return self.data.analiza if self.data is not None else {}
+
+    def _estimate_impact(self, event):
+        """Impactul estimat în punctele monitorizate (gol fără puncte)."""
+        if self.impact_sites is None:
+            return {}
+        return self.impact_sites.estimate(event)
+
+    def _detect_changed_sections(self, data: InfProPayload):
+        """Calculează amprenta fiecărei secțiuni și returnează cele modificate."""
+        hashes = {}
+        for key, section in data.sections().items():
+            serialized = json.dumps(
+                section, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+            )
+            hashes[key] = hashlib.sha1(
+                serialized.encode("utf-8"), usedforsecurity=False
+            ).hexdigest()
+
+        changed = {
+            key for key, digest in hashes.items()
+            if self._section_hashes.get(key) != digest
+        }
+        # Secțiunile dispărute din payload contează tot ca modificări
+        changed |= self._section_hashes.keys() - hashes.keys()
+        self._section_hashes = hashes
+        return changed
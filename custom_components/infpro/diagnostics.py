@@ -0,0 +1,41 @@
+"""Diagnostic pentru integrarea INFP."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+# Punctele monitorizate pot conține coordonatele locuinței
+TO_REDACT = {"puncte_monitorizate", "stream_url", "surse_suplimentare"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Returnează datele de diagnostic pentru un config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    data = coordinator.data
+
+    return {
+        "entry": async_redact_data(
+            {"data": dict(entry.data), "options": dict(entry.options)}, TO_REDACT
+        ),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_s": coordinator.update_interval.total_seconds(),
+            "changed_sections": sorted(coordinator.changed_sections),
+            "last_smevid": coordinator.last_smevid,
+            "is_stale": coordinator.is_stale,
+            "degraded": coordinator.degraded,
+            "push_connected": coordinator.push_connected,
+            "data_fetched_at": (
+                coordinator.data_fetched_at.isoformat()
+                if coordinator.data_fetched_at else None
+            ),
+            "analiza_rows": len(data.analiza) if data else 0,
+            "history_events": len(coordinator.history) if coordinator.history else 0,
+            "history_indexed": coordinator.history.indexed if coordinator.history else 0,
+        },
+        "fetch_cache": coordinator.api.fetch_cache.stats,
+        "circuit": coordinator.api.breaker.as_dict(),
+        "sources": getattr(coordinator.api, "sources_status", {}),
+        "metrics": coordinator.metrics.as_dict(),
+    }
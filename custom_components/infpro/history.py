@@ -0,0 +1,280 @@
+"""Istoricul evenimentelor seismice pentru integrarea INFP."""
+from bisect import bisect_left, insort
+from collections import deque
+import heapq
+import json
+import logging
+import os
+
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util import dt as dt_util
+
+from .aggregates import WindowAggregates
+from .const import DOMAIN, HISTORY_SIZE
+from .models import EarthquakeEvent, EventSummary
+from .spatial import GridIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _timestamp(event):
+    return event.timestamp
+
+
+class EventHistory:
+    """
+    Istoric persistent al evenimentelor.
+
+    Pe disc: fișier JSONL append-only (o linie per `smevid`, scris incremental).
+    În memorie: ultimele `maxlen` evenimente într-un `deque`, pentru acces O(1),
+    un index spațial cu rezumatele (`EventSummary`) tuturor evenimentelor
+    cunoscute, pentru interogări de proximitate, aceleași rezumate în ordine
+    cronologică (pentru statisticile importului) și agregatele pe ferestre
+    glisante (24h … 365z), actualizate incremental.
+    """
+
+    def __init__(self, hass, maxlen=HISTORY_SIZE, path=None):
+        """Inițializează istoricul."""
+        self.hass = hass
+        self._path = path or hass.config.path(STORAGE_DIR, f"{DOMAIN}_istoric.jsonl")
+        self._events = deque(maxlen=maxlen)
+        self._ids = set()
+        self._index = GridIndex()
+        # Rezumatele evenimentelor cu timp cunoscut, ordonate cronologic
+        self._timeline = []
+        self.aggregates = WindowAggregates()
+
+    async def async_load(self):
+        """Încarcă istoricul de pe disc (în executor)."""
+        summaries, events = await self.hass.async_add_executor_job(self._scan)
+        for summary in summaries:
+            self._ids.add(summary.smevid)
+            self._index.add(summary)
+        self._timeline = [summary for summary in summaries if summary.timestamp is not None]
+        self._events.extend(events)
+        # Ferestrele pot cuprinde mai multe evenimente decât cele păstrate în `deque`
+        now = dt_util.utcnow().timestamp()
+        self.aggregates.rebuild(self.since(now - self.aggregates.horizon), now)
+        _LOGGER.debug(
+            "Istoric încărcat: %s evenimente cunoscute, %s în memorie.",
+            len(self._ids),
+            len(self._events),
+        )
+
+    async def async_add(self, event):
+        """
+        Adaugă un eveniment nou în istoric.
+
+        :return: True dacă evenimentul era necunoscut și a fost adăugat.
+        """
+        if event.smevid in self._ids:
+            return False
+
+        self._ids.add(event.smevid)
+        self._append(event)
+        summary = EventSummary.from_event(event)
+        self._index.add(summary)
+        if summary.timestamp is not None:
+            if self._timeline and summary.timestamp < self._timeline[-1].timestamp:
+                insort(self._timeline, summary, key=_timestamp)
+            else:
+                self._timeline.append(summary)
+        self.aggregates.add(summary)
+        line = json.dumps(event.as_dict(), ensure_ascii=False, separators=(",", ":"))
+        await self.hass.async_add_executor_job(self._append_line, line)
+        _LOGGER.debug("Eveniment adăugat în istoric: %s", event)
+        return True
+
+    async def async_import(self, chunks, on_imported=None):
+        """
+        Importă în bloc evenimente istorice (ex. dintr-un catalog), bloc cu bloc.
+
+        `chunks` este un iterator asincron de liste de evenimente. Fiecare bloc
+        este deduplicat (după `smevid`), scris imediat pe disc și adăugat în
+        index; din evenimentele complete sunt păstrate doar ultimele `maxlen`.
+        Fișierul nu este recitit: cronologia și agregatele primesc la final
+        doar rezumatele noi.
+
+        :param on_imported: apelat cu fiecare listă de evenimente noi (ex. pentru statistici).
+        :return: numărul de evenimente noi.
+        """
+        imported = 0
+        pending = []
+        try:
+            async for chunk in chunks:
+                new = []
+                seen = set()
+                for event in chunk:
+                    if event.smevid in self._ids or event.smevid in seen:
+                        continue
+                    seen.add(event.smevid)
+                    new.append(event)
+                if not new:
+                    continue
+
+                await self.hass.async_add_executor_job(
+                    self._append_lines,
+                    [
+                        json.dumps(event.as_dict(), ensure_ascii=False, separators=(",", ":"))
+                        for event in new
+                    ],
+                )
+                # Doar după scriere: un bloc nescris poate fi importat din nou
+                self._ids |= seen
+                for event in new:
+                    summary = EventSummary.from_event(event)
+                    self._index.add(summary)
+                    pending.append(summary)
+                self._merge_tail(new)
+                imported += len(new)
+                if on_imported is not None:
+                    on_imported(new)
+        finally:
+            # Și după o eroare la mijlocul importului, memoria reflectă blocurile deja scrise
+            self._merge_timeline(pending)
+        _LOGGER.debug(
+            "Import în istoric: %s evenimente noi, %s cunoscute în total.", imported, len(self._ids)
+        )
+        return imported
+
+    def _merge_tail(self, events):
+        """Păstrează în `deque` cele mai noi `maxlen` evenimente dintre cele existente și cele noi."""
+        maxlen = self._events.maxlen
+        if maxlen and len(self._events) == maxlen:
+            # Evenimentele mai vechi decât tot ce este în `deque` nu intră în el
+            oldest = self._events[0].timestamp or 0.0
+            events = [event for event in events if (event.timestamp or 0.0) > oldest]
+            if not events:
+                return
+        merged = sorted([*self._events, *events], key=lambda event: event.timestamp or 0.0)
+        self._events = deque(merged[-maxlen:] if maxlen else merged, maxlen=maxlen)
+
+    def _merge_timeline(self, summaries):
+        """Interclasează rezumatele importate în cronologie și în agregate."""
+        summaries = sorted(
+            (summary for summary in summaries if summary.timestamp is not None), key=_timestamp
+        )
+        if not summaries:
+            return
+        self._timeline = list(heapq.merge(self._timeline, summaries, key=_timestamp))
+        self.aggregates.extend(summaries, dt_util.utcnow().timestamp())
+
+    def since(self, timestamp):
+        """Rezumatele evenimentelor de la `timestamp` încolo, în ordine cronologică."""
+        return self._timeline[bisect_left(self._timeline, timestamp, key=_timestamp):]
+
+    def count_before(self, timestamp):
+        """Numărul de evenimente (cu timp cunoscut) anterioare lui `timestamp`."""
+        return bisect_left(self._timeline, timestamp, key=_timestamp)
+
+    def __contains__(self, smevid):
+        """Verifică dacă un `smevid` este deja cunoscut."""
+        return str(smevid) in self._ids
+
+    def __len__(self):
+        """Numărul de evenimente păstrate în memorie."""
+        return len(self._events)
+
+    @property
+    def indexed(self):
+        """Numărul de evenimente din indexul spațial (toate evenimentele cunoscute)."""
+        return len(self._index)
+
+    def __iter__(self):
+        """Iterează evenimentele din memorie, de la cel mai vechi la cel mai nou."""
+        return iter(self._events)
+
+    @property
+    def latest(self):
+        """Cel mai recent eveniment (sau None)."""
+        return self._events[-1] if self._events else None
+
+    def recent(self, count=None):
+        """Returnează ultimele `count` evenimente, de la cel mai nou la cel mai vechi."""
+        if count is None or count >= len(self._events):
+            return list(reversed(self._events))
+        return [self._events[-i] for i in range(1, count + 1)]
+
+    def query(self, lat, lon, radius_km, since=None, min_magnitude=None):
+        """
+        Evenimentele cunoscute aflate la cel mult `radius_km` de (lat, lon).
+
+        Sunt căutate toate evenimentele din istoric (inclusiv cele importate),
+        nu doar cele păstrate în `deque`.
+
+        :return: listă de (distanță_km, EventSummary), sortată după distanță.
+        """
+        return self._index.query(lat, lon, radius_km, since, min_magnitude)
+
+    def _append(self, event):
+        """Adaugă evenimentul complet în `deque` (cel mai vechi iese automat)."""
+        self._events.append(event)
+
+    def _scan(self):
+        """
+        Parcurge fișierul o singură dată (rulează în executor).
+
+        Pentru fiecare `smevid` (prima apariție) este păstrat doar rezumatul;
+        evenimente complete sunt construite doar pentru ultimele `maxlen`
+        (după timp). Fișierul este append-only, deci un catalog importat poate
+        apărea după evenimentele live mai noi; doar atunci rezumatele sunt
+        sortate (o interclasare a secvențelor deja ordonate).
+
+        :return: (rezumatele, ordonate cronologic; ultimele evenimente complete, ordonate cronologic).
+        """
+        if not os.path.exists(self._path):
+            return [], []
+
+        maxlen = self._events.maxlen
+        summaries = []
+        ids = set()
+        # Min-heap (timestamp, linie, valori) cu cele mai noi `maxlen` evenimente
+        tail = []
+        ordered = True
+        latest = 0.0
+        with open(self._path, encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    values = json.loads(line)
+                    summary = EventSummary.from_dict(values)
+                except (ValueError, TypeError, AttributeError) as err:
+                    _LOGGER.warning(
+                        "Linie invalidă (%s) în istoricul INFP, ignorată: %s", number, err
+                    )
+                    continue
+                if summary.smevid in ids:
+                    continue
+                ids.add(summary.smevid)
+                summaries.append(summary)
+
+                key = summary.timestamp or 0.0
+                if key < latest:
+                    ordered = False
+                else:
+                    latest = key
+                entry = (key, number, values)
+                if not maxlen or len(tail) < maxlen:
+                    heapq.heappush(tail, entry)
+                elif entry > tail[0]:
+                    heapq.heapreplace(tail, entry)
+
+        if not ordered:
+            # Sortare stabilă: evenimentele fără timp rămân la început, în ordinea din fișier
+            summaries.sort(key=lambda summary: summary.timestamp or 0.0)
+        events = [EarthquakeEvent.from_dict(values) for _, _, values in sorted(tail)]
+        return summaries, events
+
+    def _append_line(self, line):
+        """Adaugă o linie la sfârșitul fișierului (rulează în executor)."""
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    def _append_lines(self, lines):
+        """Adaugă mai multe linii la sfârșitul fișierului, într-o singură scriere (în executor)."""
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.writelines(line + "\n" for line in lines)
@@ -0,0 +1,195 @@
+"""Estimarea locală a impactului unui cutremur pentru puncte de interes."""
+import logging
+import math
+
+from homeassistant.util import slugify
+
+from .spatial import EARTH_RADIUS_KM
+
+_LOGGER = logging.getLogger(__name__)
+
+# Numele punctului corespunzător zonei „home” din Home Assistant
+HOME_SITE = "Acasă"
+
+ROMAN = ("I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII")
+
+
+class ImpactSite:
+    """Punct de interes pentru care se estimează impactul."""
+
+    __slots__ = ("name", "lat", "lon")
+
+    def __init__(self, name, lat, lon):
+        """Inițializează punctul."""
+        self.name = name
+        self.lat = lat
+        self.lon = lon
+
+
+class ImpactEstimate:
+    """Impactul estimat într-un punct, pentru un eveniment."""
+
+    __slots__ = (
+        "name",
+        "epicentral_km",
+        "hypocentral_km",
+        "pga_g",
+        "pgv_cms",
+        "intensity",
+    )
+
+    def __init__(self, name, epicentral_km, hypocentral_km, pga_g, pgv_cms, intensity):
+        """Inițializează estimarea."""
+        self.name = name
+        self.epicentral_km = epicentral_km
+        self.hypocentral_km = hypocentral_km
+        self.pga_g = pga_g
+        self.pgv_cms = pgv_cms
+        self.intensity = intensity
+
+    @property
+    def intensity_roman(self):
+        """Intensitatea rotunjită, în cifre romane (cheile din INTENSITY_MAP)."""
+        return ROMAN[int(round(self.intensity)) - 1]
+
+
+class SiteTable:
+    """
+    Tabel de puncte cu coordonatele precalculate (radiani, cosinusul latitudinii).
+
+    Construit o singură dată; evaluarea unui eveniment pentru toate punctele
+    se face într-o singură trecere, fără conversii repetate.
+    """
+
+    def __init__(self, sites):
+        """Inițializează tabelul."""
+        self.sites = tuple(sites)
+        self._lat = tuple(math.radians(site.lat) for site in self.sites)
+        self._lon = tuple(math.radians(site.lon) for site in self.sites)
+        self._cos_lat = tuple(math.cos(lat) for lat in self._lat)
+
+    def __len__(self):
+        """Numărul de puncte."""
+        return len(self.sites)
+
+    def estimate(self, event):
+        """Impactul estimat al evenimentului în toate punctele (vezi `compute_impact`)."""
+        return compute_impact(event, self)
+
+    def epicentral_distances(self, lat, lon):
+        """Distanțele haversine (km) de la (lat, lon) la toate punctele."""
+        lat0 = math.radians(lat)
+        lon0 = math.radians(lon)
+        cos_lat0 = math.cos(lat0)
+        sin = math.sin
+        asin = math.asin
+        sqrt = math.sqrt
+        return [
+            2.0 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(
+                sin((lat1 - lat0) * 0.5) ** 2
+                + cos_lat0 * cos_lat1 * sin((lon1 - lon0) * 0.5) ** 2
+            )))
+            for lat1, lon1, cos_lat1 in zip(self._lat, self._lon, self._cos_lat)
+        ]
+
+
+# Relația Campbell (1981) pentru mediana PGA (g), R = distanța hipocentrală (km):
+#   ln(PGA) = -4.141 + 0.868·M - 1.09·ln(R + 0.0606·e^(0.7·M))
+# Intensitatea din PGA și PGV din intensitate: Wald et al. (1999).
+# Valorile sunt estimări orientative, nu înlocuiesc analiza INFP.
+LOG10_G_CMS2 = math.log10(980.665)
+
+
+def intensity_from_pga(pga_g):
+    """Intensitatea macroseismică (1–12) din PGA exprimată în g."""
+    log_pga = math.log10(max(pga_g, 1e-9)) + LOG10_G_CMS2
+    intensity = 3.66 * log_pga - 1.66
+    if intensity < 5.0:
+        intensity = 2.20 * log_pga + 1.00
+    return min(12.0, max(1.0, intensity))
+
+
+def pgv_from_intensity(intensity):
+    """Viteza maximă a solului (cm/s) din intensitate."""
+    if intensity >= 5.0:
+        return 10 ** ((intensity - 2.35) / 3.47)
+    return 10 ** ((intensity - 3.40) / 2.10)
+
+
+def compute_impact(event, table):
+    """
+    Estimează impactul evenimentului pentru toate punctele din tabel.
+
+    Termenii care depind doar de magnitudine sunt calculați o singură dată;
+    bucla pe puncte face doar operațiile dependente de distanță.
+
+    :return: dicționar nume punct -> ImpactEstimate (gol dacă lipsesc datele).
+    """
+    if event is None or not len(table) or event.elat is None or event.elon is None:
+        return {}
+    magnitude = event.mag_mw if event.mag_mw is not None else event.mag_ml
+    if magnitude is None:
+        return {}
+    depth_sq = (event.depth or 0.0) ** 2
+
+    source_term = -4.141 + 0.868 * magnitude
+    near_field = 0.0606 * math.exp(0.7 * magnitude)
+    log = math.log
+    exp = math.exp
+    sqrt = math.sqrt
+
+    estimates = {}
+    for site, epicentral in zip(
+        table.sites, table.epicentral_distances(event.elat, event.elon)
+    ):
+        hypocentral = sqrt(epicentral * epicentral + depth_sq)
+        pga = exp(source_term - 1.09 * log(hypocentral + near_field))
+        intensity = intensity_from_pga(pga)
+        estimates[site.name] = ImpactEstimate(
+            site.name, epicentral, hypocentral, pga, pgv_from_intensity(intensity), intensity
+        )
+    return estimates
+
+
+def parse_points(text):
+    """
+    Interpretează punctele configurate, câte unul pe linie: `Nume: lat, lon`.
+
+    Numele trebuie să fie unice (după `slugify`, folosit în unique_id) și
+    diferite de punctul zonei „home”.
+
+    :raises ValueError: dacă o linie nu respectă formatul sau numele se repetă.
+    """
+    sites = []
+    slugs = {slugify(HOME_SITE)}
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        name, _, coords = line.rpartition(":")
+        lat, _, lon = coords.partition(",")
+        name = name.strip()
+        if not name:
+            raise ValueError(f"Linie fără nume: {line}")
+        lat = float(lat)
+        lon = float(lon)
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            raise ValueError(f"Coordonate invalide: {line}")
+        slug = slugify(name)
+        if slug in slugs:
+            raise ValueError(f"Nume de punct duplicat: {name}")
+        slugs.add(slug)
+        sites.append(ImpactSite(name, lat, lon))
+    return sites
+
+
+def build_site_table(hass, points_text=None):
+    """Tabelul de puncte: zona „home” din Home Assistant plus punctele configurate."""
+    sites = []
+    if hass.config.latitude is not None and hass.config.longitude is not None:
+        sites.append(ImpactSite(HOME_SITE, hass.config.latitude, hass.config.longitude))
+    try:
+        sites.extend(parse_points(points_text))
+    except ValueError as err:
+        _LOGGER.error("Punctele de monitorizare configurate sunt invalide: %s", err)
+    return SiteTable(sites)
@@ -0,0 +1,142 @@
+"""Instrumentarea căii de actualizare: timpi pe faze, contoare și percentile."""
+from collections import deque
+import time
+
+from aiohttp import TraceConfig
+
+from .const import METRICS_RESERVOIR_SIZE
+
+# Fazele măsurate (în secunde)
+PHASE_DNS = "dns"
+PHASE_CONNECT = "connect"
+PHASE_TTFB = "ttfb"
+PHASE_DOWNLOAD = "download"
+PHASE_PARSE = "parse"
+PHASE_DISPATCH = "dispatch"
+PHASES = (PHASE_DNS, PHASE_CONNECT, PHASE_TTFB, PHASE_DOWNLOAD, PHASE_PARSE, PHASE_DISPATCH)
+
+
+class Reservoir:
+    """Rezervor de dimensiune fixă cu ultimele eșantioane, pentru percentile glisante."""
+
+    __slots__ = ("_samples", "count")
+
+    def __init__(self, size=METRICS_RESERVOIR_SIZE):
+        """Inițializează rezervorul."""
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        """Adaugă un eșantion."""
+        self._samples.append(value)
+        self.count += 1
+
+    def __len__(self):
+        """Numărul de eșantioane păstrate."""
+        return len(self._samples)
+
+    def percentiles(self, *quantiles):
+        """Percentilele cerute (metoda rangului cel mai apropiat); None dacă e gol."""
+        if not self._samples:
+            return tuple(None for _ in quantiles)
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(q * len(ordered)))] for q in quantiles)
+
+
+class InfProMetrics:
+    """Timpii fazelor de actualizare și contoarele răspunsurilor API."""
+
+    def __init__(self, size=METRICS_RESERVOIR_SIZE):
+        """Inițializează metricile."""
+        self.phases = {phase: Reservoir(size) for phase in PHASES}
+        self.requests = 0
+        self.responses_200 = 0
+        self.responses_304 = 0
+        self.errors = 0
+        self.refreshes_changed = 0
+        self.refreshes_unchanged = 0
+        self.payload_bytes = None
+        self.setup_seconds = None
+
+    def record(self, phase, seconds):
+        """Înregistrează durata unei faze."""
+        self.phases[phase].add(seconds)
+
+    @property
+    def not_modified_rate(self):
+        """Proporția răspunsurilor 304 din răspunsurile reușite."""
+        total = self.responses_200 + self.responses_304
+        return self.responses_304 / total if total else None
+
+    @property
+    def change_rate(self):
+        """Proporția actualizărilor care au adus date modificate."""
+        total = self.refreshes_changed + self.refreshes_unchanged
+        return self.refreshes_changed / total if total else None
+
+    def phase_summary(self, phase):
+        """Rezumatul unei faze: p50/p95/p99 (ms) și numărul de eșantioane."""
+        reservoir = self.phases[phase]
+        p50, p95, p99 = reservoir.percentiles(0.50, 0.95, 0.99)
+        return {
+            "p50_ms": _ms(p50),
+            "p95_ms": _ms(p95),
+            "p99_ms": _ms(p99),
+            "esantioane": len(reservoir),
+            "total": reservoir.count,
+        }
+
+    def as_dict(self):
+        """Toate metricile, pentru diagnostic."""
+        return {
+            "faze": {phase: self.phase_summary(phase) for phase in PHASES},
+            "cereri": self.requests,
+            "raspunsuri_200": self.responses_200,
+            "raspunsuri_304": self.responses_304,
+            "erori": self.errors,
+            "rata_304": self.not_modified_rate,
+            "actualizari_modificate": self.refreshes_changed,
+            "actualizari_nemodificate": self.refreshes_unchanged,
+            "rata_modificari": self.change_rate,
+            "dimensiune_payload_octeti": self.payload_bytes,
+            "durata_configurare_s": self.setup_seconds,
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def create_trace_config(metrics: InfProMetrics):
+    """
+    TraceConfig aiohttp care măsoară rezolvarea DNS, conectarea și timpul
+    până la primul octet (antetele răspunsului) pentru fiecare cerere.
+    """
+    trace_config = TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_dns_start(session, context, params):
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, context, params):
+        metrics.record(PHASE_DNS, time.perf_counter() - context.dns_start)
+
+    async def on_connection_start(session, context, params):
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_end(session, context, params):
+        metrics.record(PHASE_CONNECT, time.perf_counter() - context.connect_start)
+
+    async def on_request_end(session, context, params):
+        metrics.record(PHASE_TTFB, time.perf_counter() - context.start)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connection_start)
+    trace_config.on_connection_create_end.append(on_connection_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
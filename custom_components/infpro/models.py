@@ -0,0 +1,369 @@
+"""Modele de date compacte pentru payload-ul API-ului INFP."""
+import logging
+
+import voluptuous as vol
+
+from homeassistant.util import dt as dt_util
+
+from .const import INTENSITY_MAP, intensity_value
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fusul orar în care API-ul raportează `local_time`
+TIMEZONE_RO = "Europe/Bucharest"
+
+
+def _optional_float(value):
+    """Convertește o valoare numerică din API în float (None dacă lipsește sau e invalidă)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _optional_str(value):
+    """Convertește o valoare din API în str (None dacă lipsește)."""
+    return None if value is None else str(value)
+
+
+def _parse_local_time(local_time):
+    """Convertește `local_time` (ora României) în timestamp UTC; None dacă nu se poate."""
+    if not local_time:
+        return None
+    moment = dt_util.parse_datetime(str(local_time))
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_util.get_time_zone(TIMEZONE_RO))
+    return moment.timestamp()
+
+
+# Schemele declarate ale secțiunilor; câmpurile nedeclarate sunt eliminate la parsare
+EVENT_SCHEMA = vol.Schema(
+    {
+        vol.Required("smevid"): vol.All(vol.NotIn([None, ""]), _optional_str),
+        vol.Optional("local_time"): _optional_str,
+        vol.Optional("mag_ml"): _optional_float,
+        vol.Optional("mag_mw"): _optional_float,
+        vol.Optional("elat"): _optional_float,
+        vol.Optional("elon"): _optional_float,
+        vol.Optional("depth"): _optional_float,
+        vol.Optional("location"): _optional_str,
+        vol.Optional("intensity"): _optional_str,
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+# `record_cutremur` folosește alte nume pentru câteva câmpuri
+RECORD_KEYS = {"new_smevid": "smevid", "new_mag_ml": "mag_ml"}
+RECORD_SCHEMA = vol.Schema(
+    {
+        vol.Required("new_smevid"): vol.All(vol.NotIn([None, ""]), _optional_str),
+        vol.Optional("new_mag_ml"): _optional_float,
+        **{
+            key: validator
+            for key, validator in EVENT_SCHEMA.schema.items()
+            if str(key) not in RECORD_KEYS.values()
+        },
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+ANALIZA_SCHEMA = vol.Schema(
+    {
+        vol.Required("oras_id"): vol.All(vol.NotIn([None, ""]), _optional_str),
+        vol.Optional("oras"): _optional_str,
+        vol.Optional("judet"): _optional_str,
+        vol.Optional("distanta_km"): _optional_float,
+        vol.Optional("pga"): _optional_float,
+        vol.Optional("pgv"): _optional_float,
+        vol.Optional("intensitate"): _optional_str,
+        vol.Optional("iacc"): _optional_float,
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+
+def normalize_oras_id(oras_id):
+    """Normalizează un oras_id (int sau str) la forma folosită ca cheie de index."""
+    return str(oras_id).strip()
+
+
+class EarthquakeEvent:
+    """Înregistrare compactă a unui eveniment seismic."""
+
+    __slots__ = (
+        "smevid",
+        "timestamp",
+        "local_time",
+        "mag_ml",
+        "mag_mw",
+        "elat",
+        "elon",
+        "depth",
+        "location",
+        "intensity",
+    )
+
+    def __init__(
+        self,
+        smevid,
+        timestamp,
+        local_time=None,
+        mag_ml=None,
+        mag_mw=None,
+        elat=None,
+        elon=None,
+        depth=None,
+        location=None,
+        intensity=None,
+    ):
+        """Inițializează evenimentul."""
+        self.smevid = smevid
+        self.timestamp = timestamp
+        self.local_time = local_time
+        self.mag_ml = mag_ml
+        self.mag_mw = mag_mw
+        self.elat = elat
+        self.elon = elon
+        self.depth = depth
+        self.location = location
+        self.intensity = intensity
+
+    @classmethod
+    def from_payload(cls, event_data, received=None):
+        """Construiește evenimentul din secțiunea `date_cutremur`, validată după schemă."""
+        values = EVENT_SCHEMA(event_data)
+        timestamp = _parse_local_time(values.get("local_time"))
+        if timestamp is None:
+            timestamp = received if received is not None else dt_util.utcnow().timestamp()
+        return cls(timestamp=timestamp, **values)
+
+    @classmethod
+    def from_record_payload(cls, record_data, received=None):
+        """Construiește evenimentul din secțiunea `record_cutremur`."""
+        values = RECORD_SCHEMA(record_data)
+        for api_key, key in RECORD_KEYS.items():
+            if api_key in values:
+                values[key] = values.pop(api_key)
+        timestamp = _parse_local_time(values.get("local_time"))
+        if timestamp is None:
+            timestamp = received if received is not None else dt_util.utcnow().timestamp()
+        return cls(timestamp=timestamp, **values)
+
+    @classmethod
+    def from_dict(cls, values):
+        """Reconstruiește evenimentul dintr-un dicționar produs de `as_dict`."""
+        return cls(**{key: values.get(key) for key in cls.__slots__})
+
+    def as_dict(self):
+        """Returnează evenimentul ca dicționar serializabil."""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def as_payload(self, keys=None):
+        """Returnează evenimentul în formatul API (fără `timestamp`)."""
+        keys = keys or {}
+        return {
+            keys.get(key, key): getattr(self, key)
+            for key in self.__slots__
+            if key != "timestamp"
+        }
+
+    def __eq__(self, other):
+        """Două evenimente sunt egale dacă au aceleași valori (fără `timestamp`)."""
+        if not isinstance(other, EarthquakeEvent):
+            return NotImplemented
+        return self.as_payload() == other.as_payload()
+
+    def __repr__(self):
+        """Reprezentare pentru depanare."""
+        return f"EarthquakeEvent(smevid={self.smevid!r}, mag_ml={self.mag_ml!r})"
+
+
+class EventSummary:
+    """
+    Rezumatul unui eveniment pentru indexul spațial al istoricului.
+
+    Păstrează doar câmpurile folosite la căutare și în agregate (timp,
+    coordonate, magnitudini, adâncime), nu și zona sau intensitatea.
+    """
+
+    __slots__ = ("smevid", "timestamp", "local_time", "mag_ml", "mag_mw", "elat", "elon", "depth")
+
+    def __init__(
+        self,
+        smevid,
+        timestamp,
+        local_time=None,
+        mag_ml=None,
+        mag_mw=None,
+        elat=None,
+        elon=None,
+        depth=None,
+    ):
+        """Inițializează rezumatul."""
+        self.smevid = smevid
+        self.timestamp = timestamp
+        self.local_time = local_time
+        self.mag_ml = mag_ml
+        self.mag_mw = mag_mw
+        self.elat = elat
+        self.elon = elon
+        self.depth = depth
+
+    @classmethod
+    def from_event(cls, event):
+        """Rezumatul unui `EarthquakeEvent`."""
+        return cls(**{key: getattr(event, key) for key in cls.__slots__})
+
+    @classmethod
+    def from_dict(cls, values):
+        """Rezumatul unui eveniment salvat cu `EarthquakeEvent.as_dict`."""
+        return cls(**{key: values.get(key) for key in cls.__slots__})
+
+    def as_payload(self):
+        """Returnează rezumatul în formatul API (fără `timestamp`)."""
+        return {key: getattr(self, key) for key in self.__slots__ if key != "timestamp"}
+
+    def __repr__(self):
+        """Reprezentare pentru depanare."""
+        return f"EventSummary(smevid={self.smevid!r}, mag_ml={self.mag_ml!r})"
+
+
+class AnalizaRow:
+    """
+    Rând compact din `analiza_cutremur`: impactul estimat într-un oraș.
+
+    Intensitatea este decodată o singură dată, la construirea rândului;
+    senzorii orașului citesc valorile gata decodate din același rând.
+    """
+
+    # Câmpurile din API, în ordinea din payload
+    FIELDS = (
+        "oras_id",
+        "oras",
+        "judet",
+        "distanta_km",
+        "pga",
+        "pgv",
+        "intensitate",
+        "iacc",
+    )
+
+    __slots__ = (*FIELDS, "intensitate_text", "intensitate_valoare")
+
+    def __init__(
+        self,
+        oras_id,
+        oras=None,
+        judet=None,
+        distanta_km=None,
+        pga=None,
+        pgv=None,
+        intensitate=None,
+        iacc=None,
+    ):
+        """Inițializează rândul."""
+        self.oras_id = oras_id
+        self.oras = oras
+        self.judet = judet
+        self.distanta_km = distanta_km
+        self.pga = pga
+        self.pgv = pgv
+        self.intensitate = intensitate
+        self.iacc = iacc
+        self.intensitate_text = INTENSITY_MAP.get(intensitate, "Necunoscută")
+        self.intensitate_valoare = intensity_value(intensitate)
+
+    @classmethod
+    def from_payload(cls, row):
+        """Construiește rândul, validat după schemă."""
+        values = ANALIZA_SCHEMA(row)
+        values["oras_id"] = normalize_oras_id(values["oras_id"])
+        return cls(**values)
+
+    def as_payload(self):
+        """Returnează rândul în formatul API."""
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def __eq__(self, other):
+        """Două rânduri sunt egale dacă au aceleași valori."""
+        if not isinstance(other, AnalizaRow):
+            return NotImplemented
+        return self.as_payload() == other.as_payload()
+
+
+class InfProPayload:
+    """Payload-ul API-ului INFP, redus la câmpurile folosite de integrare."""
+
+    __slots__ = ("event", "record", "analiza")
+
+    def __init__(self, event=None, record=None, analiza=None):
+        """Inițializează payload-ul."""
+        self.event = event
+        self.record = record
+        # Index oras_id normalizat -> AnalizaRow
+        self.analiza = analiza if analiza is not None else {}
+
+    def sections(self):
+        """Secțiunile payload-ului în formatul API, folosite pentru amprente și cache."""
+        sections = {}
+        if self.event is not None:
+            sections["date_cutremur"] = self.event.as_payload()
+        if self.record is not None:
+            sections["record_cutremur"] = self.record.as_payload(
+                {value: key for key, value in RECORD_KEYS.items()}
+            )
+        if self.analiza:
+            sections["analiza_cutremur"] = [row.as_payload() for row in self.analiza.values()]
+        return sections
+
+    def __eq__(self, other):
+        """Două payload-uri sunt egale dacă au aceleași secțiuni."""
+        if not isinstance(other, InfProPayload):
+            return NotImplemented
+        return (
+            self.event == other.event
+            and self.record == other.record
+            and self.analiza == other.analiza
+        )
+
+
+def parse_payload(data):
+    """
+    Validează payload-ul brut și îl transformă în înregistrări compacte.
+
+    O secțiune invalidă este ignorată (cu avertisment); un payload care nu este
+    dicționar ridică `vol.Invalid`.
+    """
+    if not isinstance(data, dict):
+        raise vol.Invalid(f"Payload neașteptat de tip {type(data).__name__}")
+
+    event = record = None
+    if isinstance(data.get("date_cutremur"), dict):
+        try:
+            event = EarthquakeEvent.from_payload(data["date_cutremur"])
+        except vol.Invalid as err:
+            _LOGGER.warning("Secțiunea date_cutremur nu respectă schema: %s", err)
+
+    if isinstance(data.get("record_cutremur"), dict):
+        try:
+            record = EarthquakeEvent.from_record_payload(data["record_cutremur"])
+        except vol.Invalid as err:
+            _LOGGER.warning("Secțiunea record_cutremur nu respectă schema: %s", err)
+
+    analiza = {}
+    rows = data.get("analiza_cutremur")
+    if isinstance(rows, list):
+        invalid = 0
+        for row in rows:
+            try:
+                parsed = AnalizaRow.from_payload(row)
+            except vol.Invalid:
+                invalid += 1
+                continue
+            analiza[parsed.oras_id] = parsed
+        if invalid:
+            _LOGGER.debug("%s rânduri invalide ignorate din analiza_cutremur.", invalid)
+
+    return InfProPayload(event, record, analiza)
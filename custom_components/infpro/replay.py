@@ -0,0 +1,307 @@
+"""Reluarea (replay) unei cronologii de payload-uri `date_api.json` înregistrate."""
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+import voluptuous as vol
+
+from homeassistant.core import Event, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import DOMAIN, EVENT_EARTHQUAKE, REPLAY_MAX_SNAPSHOTS, REPLAY_SETTLE_TIMEOUT
+from .metrics import PHASE_PARSE
+from .models import parse_payload
+
+_LOGGER = logging.getLogger(__name__)
+
+# Atributul senzorului Cutremur care conține `smevid`-ul evenimentului curent
+ATTR_SMEVID = "ID eveniment"
+
+
+class ReplaySnapshot:
+    """Un instantaneu înregistrat: momentul relativ (secunde), numele fișierului și corpul brut."""
+
+    __slots__ = ("offset", "name", "body")
+
+    def __init__(self, offset, name, body):
+        """Inițializează instantaneul."""
+        self.offset = offset
+        self.name = name
+        self.body = body
+
+
+def _snapshot_time(name):
+    """Marcajul de timp din numele fișierului (timestamp Unix sau dată ISO); None dacă lipsește."""
+    stem = os.path.splitext(name)[0]
+    try:
+        return float(stem)
+    except ValueError:
+        pass
+    moment = dt_util.parse_datetime(stem)
+    return moment.timestamp() if moment is not None else None
+
+
+def load_timeline(path, interval):
+    """
+    Citește cronologia dintr-un director cu instantanee `*.json` (rulează în executor).
+
+    Dacă toate fișierele au în nume un marcaj de timp (ex. `1700000000.json`
+    sau `2024-01-01T10:00:00.json`), instantaneele sunt reluate la distanțele
+    reale dintre ele; altfel sunt reluate în ordinea numelor, la `interval`
+    secunde unul de altul.
+    """
+    names = sorted(name for name in os.listdir(path) if name.lower().endswith(".json"))
+    if not names:
+        raise ValueError(f"Directorul {path} nu conține instantanee .json")
+    if len(names) > REPLAY_MAX_SNAPSHOTS:
+        raise ValueError(
+            f"Directorul {path} conține {len(names)} instantanee (maximum {REPLAY_MAX_SNAPSHOTS})"
+        )
+
+    times = [_snapshot_time(name) for name in names]
+    if None in times:
+        timeline = [(index * interval, name) for index, name in enumerate(names)]
+    else:
+        start = min(times)
+        timeline = sorted((moment - start, name) for moment, name in zip(times, names))
+
+    snapshots = []
+    for offset, name in timeline:
+        with open(os.path.join(path, name), "rb") as file:
+            snapshots.append(ReplaySnapshot(offset, name, file.read()))
+    _LOGGER.debug(
+        "Cronologie încărcată din %s: %s instantanee, %.0f secunde.",
+        path,
+        len(snapshots),
+        snapshots[-1].offset,
+    )
+    return snapshots
+
+
+class ReplayClient:
+    """
+    Client fără rețea care livrează instantaneele reluării.
+
+    Interfața este aceeași cu a `InfProApiClient`: corpul fiecărui instantaneu
+    este decodat și parsat ca un răspuns 200, iar între instantanee clientul
+    răspunde „nemodificat”, ca un 304.
+    """
+
+    def __init__(self, primary):
+        """Inițializează clientul."""
+        self._primary = primary
+        self._pending = None
+        # Numele instantaneelor care nu au putut fi parsate
+        self.invalid = []
+
+    @property
+    def fetch_cache(self):
+        """Stratul single-flight al clientului înlocuit."""
+        return self._primary.fetch_cache
+
+    @property
+    def metrics(self):
+        """Metricile clientului înlocuit."""
+        return self._primary.metrics
+
+    @property
+    def breaker(self):
+        """Circuit breaker-ul clientului înlocuit."""
+        return self._primary.breaker
+
+    @property
+    def validators(self):
+        """Fără validatori: un payload reluat nu trebuie confirmat printr-un 304 după repornire."""
+        return {"etag": None, "last_modified": None}
+
+    def restore_validators(self, etag=None, last_modified=None, payload=None):
+        """Nimic de restaurat în timpul reluării."""
+
+    def release(self, snapshot: ReplaySnapshot):
+        """Instantaneul livrat la următoarea interogare."""
+        self._pending = snapshot
+
+    async def async_fetch_data(self):
+        """
+        Returnează instantaneul eliberat, parsat ca un răspuns al API-ului.
+
+        :return: Payload-ul validat sau None dacă nu a fost eliberat niciun instantaneu nou.
+        """
+        snapshot, self._pending = self._pending, None
+        if snapshot is None:
+            return None
+        start = time.perf_counter()
+        try:
+            data = parse_payload(json_loads(snapshot.body))
+        except (vol.Invalid, ValueError) as err:
+            # Un fișier greșit din cronologie nu este o cădere a API-ului: nu
+            # trece prin calea datelor învechite, iar coordonatorul îl vede ca
+            # „nemodificat”
+            _LOGGER.warning("Instantaneu invalid în reluare (%s): %s", snapshot.name, err)
+            self.invalid.append(snapshot.name)
+            return None
+        self.metrics.record(PHASE_PARSE, time.perf_counter() - start)
+        return data
+
+
+def _summary(values):
+    """Mediana și maximul unei serii de latențe (ms)."""
+    if not values:
+        return None
+    return {"mediana": round(statistics.median(values), 2), "max": round(max(values), 2)}
+
+
+class ReplayRunner:
+    """
+    Alimentează coordonatorul dintr-o cronologie înregistrată, fără rețea.
+
+    Pe durata reluării clientul coordonatorului este înlocuit cu un
+    `ReplayClient`, iar fiecare instantaneu trece prin aceeași interogare,
+    parsare și detectare a modificărilor ca un răspuns real. Pentru fiecare
+    `smevid` nou se măsoară timpul până la starea senzorului Cutremur și până
+    la evenimentul `infpro_earthquake` (doar dacă pragurile de alertă sunt
+    depășite). La final sunt restaurate clientul, starea alertelor și ultimul
+    payload real.
+    """
+
+    def __init__(self, hass, coordinator, speed=1.0, settle_timeout=REPLAY_SETTLE_TIMEOUT):
+        """Inițializează reluarea (`speed=0`: fără pauze între instantanee)."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.snapshots = []
+        self.speed = speed
+        self.settle_timeout = settle_timeout
+        # smevid -> momentul (perf_counter) în care a apărut în stare / pe magistrală
+        self._state_seen = {}
+        self._event_seen = {}
+
+    @callback
+    def _async_state_changed(self, event: Event):
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        smevid = new_state.attributes.get(ATTR_SMEVID)
+        if smevid is not None:
+            self._state_seen.setdefault(str(smevid), time.perf_counter())
+
+    @callback
+    def _async_earthquake(self, event: Event):
+        smevid = event.data.get("smevid")
+        if smevid is not None:
+            self._event_seen.setdefault(str(smevid), time.perf_counter())
+
+    async def async_run(self, snapshots):
+        """
+        Rulează reluarea.
+
+        Apelantul poate marca reluarea în coordonator (`coordinator.replay`)
+        încă dinainte de citirea cronologiei; marcajul este șters la final.
+
+        :return: raportul reluării (instantanee, evenimente noi și latențele lor).
+        """
+        self.snapshots = snapshots
+        coordinator = self.coordinator
+        primary = coordinator.api
+        client = ReplayClient(primary)
+        previous = coordinator.data
+        last_smevid = coordinator.last_smevid
+        alert_state = coordinator.alerts.state if coordinator.alerts is not None else None
+
+        unsubscribe = [self.hass.bus.async_listen(EVENT_EARTHQUAKE, self._async_earthquake)]
+        entity_id = er.async_get(self.hass).async_get_entity_id(
+            "sensor", DOMAIN, f"{DOMAIN}_cutremur"
+        )
+        if entity_id is not None:
+            unsubscribe.append(
+                async_track_state_change_event(self.hass, [entity_id], self._async_state_changed)
+            )
+
+        coordinator.api = client
+        coordinator.replay = self
+        released = []
+        start = time.perf_counter()
+        try:
+            current_smevid = last_smevid
+            for snapshot in self.snapshots:
+                if self.speed > 0:
+                    delay = start + snapshot.offset / self.speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                client.release(snapshot)
+                released_at = time.perf_counter()
+                await coordinator.async_refresh()
+                if (
+                    coordinator.last_smevid is not None
+                    and coordinator.last_smevid != current_smevid
+                ):
+                    current_smevid = coordinator.last_smevid
+                    released.append((str(current_smevid), snapshot.name, released_at))
+                    _LOGGER.debug("Reluare: smevid=%s nou în %s.", current_smevid, snapshot.name)
+
+            # Entitățile își scriu starea în aceeași iterație; lăsăm totuși
+            # ascultătorii întârziați să termine, în limita `settle_timeout`
+            deadline = time.perf_counter() + self.settle_timeout
+            while (
+                entity_id is not None
+                and any(smevid not in self._state_seen for smevid, _, _ in released)
+                and time.perf_counter() < deadline
+            ):
+                await asyncio.sleep(0.05)
+        finally:
+            for remove in unsubscribe:
+                remove()
+            coordinator.api = primary
+            coordinator.replay = None
+            await self._async_restore(previous, last_smevid, alert_state)
+
+        duration = time.perf_counter() - start
+        events = []
+        for smevid, name, released_at in released:
+            state_at = self._state_seen.get(smevid)
+            event_at = self._event_seen.get(smevid)
+            events.append({
+                "smevid": smevid,
+                "fisier": name,
+                "stare_ms": (
+                    round((state_at - released_at) * 1000, 2)
+                    if state_at is not None and state_at >= released_at else None
+                ),
+                "eveniment_ms": (
+                    round((event_at - released_at) * 1000, 2)
+                    if event_at is not None and event_at >= released_at else None
+                ),
+            })
+
+        report = {
+            "instantanee": len(self.snapshots),
+            "invalide": client.invalid,
+            "evenimente_noi": len(events),
+            "durata_s": round(duration, 3),
+            "stare_ms": _summary([item["stare_ms"] for item in events if item["stare_ms"] is not None]),
+            "eveniment_ms": _summary(
+                [item["eveniment_ms"] for item in events if item["eveniment_ms"] is not None]
+            ),
+            "evenimente": events,
+        }
+        _LOGGER.debug("Reluare încheiată: %s", {k: v for k, v in report.items() if k != "evenimente"})
+        return report
+
+    async def _async_restore(self, previous, last_smevid, alert_state):
+        """Restaurează alertele, planificatorul și ultimul payload real, apoi cere o interogare."""
+        coordinator = self.coordinator
+        if alert_state is not None:
+            coordinator.alerts.async_restore(alert_state)
+        # Evenimentele reluate nu trebuie să lase interogarea în regimul rapid
+        coordinator.last_smevid = last_smevid
+        coordinator.scheduler.reset()
+        if previous is not None:
+            # Același `smevid` ca în starea restaurată: nicio alertă nouă
+            await coordinator.async_push_payload(previous)
+        await coordinator.async_request_refresh()
+        _LOGGER.debug("Reluare: clientul API și ultimul payload real au fost restaurate.")
@@ -1,220 +1,481 @@
-
+from abc import ABC, abstractmethod
 import logging
-import os
-import aiofiles
+import time
 from datetime import timedelta
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfLength,
+    UnitOfTime,
+)
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import Throttle
-
-from .const import DOMAIN, ATTRIBUTION, INTENSITY_MAP, JUDETE_MAP
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import (
+    DOMAIN,
+    ATTRIBUTION,
+    INTENSITY_MAP,
+    PROXIMITY_DAYS,
+    PROXIMITY_MIN_MAG,
+    PROXIMITY_RADIUS,
+)
+from .aggregates import WINDOWS
+from .metrics import PHASE_DISPATCH, PHASES
+from .models import normalize_oras_id
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _or_na(value):
+    """Returnează valoarea sau „N/A” dacă lipsește."""
+    return "N/A" if value is None else value
+
+
+# Marcajele de date învechite (pornire din cache sau API indisponibil)
+STALE_ATTRIBUTES = frozenset({
+    "Date din cache (descărcate la)",
+    "Date învechite (descărcate la)",
+})
+
+# Câmpurile evenimentului păstrate doar ca atribute curente, fără istoric în
+# recorder: doar cele care au senzori proprii (`EVENT_VALUE_SENSORS`); ora,
+# coordonatele, zona și intensitatea rămân în istoric
+EVENT_UNRECORDED_ATTRIBUTES = frozenset({
+    "Magnitudine (ML)",
+    "Magnitudinea Momentului (Mw)",
+    "Adâncime (km)",
+})
+
+# Senzorii numerici ai evenimentului curent: câmp, nume, unitate, device_class
+EVENT_VALUE_SENSORS = (
+    ("mag_ml", "Magnitudine cutremur (ML)", None, None),
+    ("mag_mw", "Magnitudine cutremur (Mw)", None, None),
+    ("depth", "Adâncime cutremur", UnitOfLength.KILOMETERS, SensorDeviceClass.DISTANCE),
+)
+
+# Senzorii numerici ai analizei pe orașe: câmp din AnalizaRow, nume, unitate, device_class
+CITY_VALUE_SENSORS = (
+    ("distanta_km", "Distanță epicentru", UnitOfLength.KILOMETERS, SensorDeviceClass.DISTANCE),
+    ("pga", "Accelerația maximă a solului", "%g", None),
+    ("pgv", "Viteza maximă a solului", "cm/s", None),
+    ("iacc", "Intensitatea accelerației", None, None),
+    ("intensitate_valoare", "Intensitate", None, None),
+)
+
+
+def city_value_sensors(coordinator, orase, enabled=True):
+    """
+    Creează senzorii numerici din `CITY_VALUE_SENSORS` pentru fiecare oraș.
+
+    Toți senzorii unui oraș citesc același rând decodat (AnalizaRow) din
+    indexul coordonatorului, construit o singură dată per payload.
+    """
+    return [
+        CityValueSensor(coordinator, oras_id, oras_nume, *description, enabled=enabled)
+        for oras_id, oras_nume in orase.items()
+        for description in CITY_VALUE_SENSORS
+    ]
+
+
+def _event_attributes(event):
+    """Atributele comune pentru un eveniment (`date_cutremur` sau `record_cutremur`)."""
+    return {
+        "ID eveniment": _or_na(event.smevid),
+        "Magnitudine (ML)": _or_na(event.mag_ml),
+        "Magnitudinea Momentului (Mw)": _or_na(event.mag_mw),
+        "Ora locală": _or_na(event.local_time),
+        "Latitudine": _or_na(event.elat),
+        "Longitudine": _or_na(event.elon),
+        "Adâncime (km)": _or_na(event.depth),
+        "Zonă": _or_na(event.location),
+        "Intensitate": INTENSITY_MAP.get(event.intensity, "Necunoscută"),
+    }
+
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Configurează intrarea pentru integrarea INFP."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
-    oras_id = config_entry.data.get("oras_id")
-    oras_nume = config_entry.data.get("oras_nume")
+    orase = _selected_cities(config_entry)
 
     # 1) Senzorul principal (CutremurSensor)
-    cutremur_sensor = CutremurSensor(coordinator, oras_id, oras_nume)
+    cutremur_sensor = CutremurSensor(coordinator)
 
     # 2) Senzorul pentru datele istorice (RecordCutremurSensor)
     record_sensor = RecordCutremurSensor(coordinator)  # Corectat: eliminată referința la `hass`
 
-    # 3) Senzorul pentru analiza impactului în orașe (AnalizaDate)
-    analiza_date_sensor = AnalizaDate(coordinator, oras_id, oras_nume)
+    # 3) Câte un senzor de analiză a impactului pentru fiecare oraș (AnalizaDate)
+    analiza_sensors = [
+        AnalizaDate(coordinator, oras_id, oras_nume)
+        for oras_id, oras_nume in orase.items()
+    ]
+
+    # 4) Câte un senzor de impact estimat local pentru fiecare punct (ImpactLocal)
+    impact_sensors = [
+        ImpactLocal(coordinator, site.name)
+        for site in coordinator.impact_sites.sites
+    ] if coordinator.impact_sites is not None else []
+
+    # 5) Senzorul de proximitate (evenimente din istoric în jurul zonei „home”)
+    settings = {**config_entry.data, **config_entry.options}
+    proximitate_sensor = ProximitateCutremure(
+        coordinator,
+        settings.get("raza_proximitate", PROXIMITY_RADIUS),
+        settings.get("zile_proximitate", PROXIMITY_DAYS),
+        settings.get("magnitudine_minima", PROXIMITY_MIN_MAG),
+    )
+
+    # 6) Agregatele pe ferestre glisante (24h, 7z, 30z, 365z), din istoricul local
+    statistici_sensors = [
+        StatisticiCutremure(coordinator, window) for window in WINDOWS
+    ] if coordinator.history is not None else []
+
+    # 7) Senzorii de diagnostic (dezactivați implicit): timpi pe faze și contoare
+    diagnostic_sensors = [
+        *(DiagnosticaFaza(coordinator, phase) for phase in PHASES),
+        DiagnosticaCereri(coordinator),
+        DiagnosticaPayload(coordinator),
+    ]
+
+    # 8) Valorile numerice ale evenimentului și ale analizei pe orașe, cu
+    # state_class, pentru statisticile pe termen lung calculate de Home Assistant.
+    # Cu „toate orașele”, senzorii pe orașe sunt dezactivați implicit.
+    value_sensors = [
+        EventValueSensor(coordinator, *description) for description in EVENT_VALUE_SENSORS
+    ]
+    city_sensors = city_value_sensors(
+        coordinator, orase, enabled=not settings.get("toate_orasele")
+    )
 
     # Adaugă toate entitățile
-    async_add_entities([cutremur_sensor, record_sensor, analiza_date_sensor])
+    async_add_entities([
+        cutremur_sensor,
+        *value_sensors,
+        proximitate_sensor,
+        record_sensor,
+        *statistici_sensors,
+        *impact_sensors,
+        *diagnostic_sensors,
+        *analiza_sensors,
+        *city_sensors,
+    ])
 
     _LOGGER.debug(
-        "Senzorii pentru INFP au fost configurați: Oras ID=%s, Oras Nume=%s. "
-        "Senzorii Cutremur, RecordCutremur și AnalizaDate au fost adăugați.",
-        oras_id,
-        oras_nume,
+        "Senzorii pentru INFP au fost configurați pentru %s orașe și %s puncte.",
+        len(analiza_sensors),
+        len(impact_sensors),
     )
 
 
+def _selected_cities(config_entry):
+    """Returnează orașele monitorizate ({oras_id: oras_nume}) din config entry."""
+    settings = {**config_entry.data, **config_entry.options}
+    if not settings.get("toate_orasele") and not settings.get("oras_ids"):
+        return {}
+
+    # Tabela orașelor este încărcată doar dacă există orașe monitorizate
+    from .orase import ORASE_BY_ID
+
+    if settings.get("toate_orasele"):
+        return dict(ORASE_BY_ID)
+
+    return {
+        oras_id: ORASE_BY_ID.get(oras_id, "Necunoscut")
+        for oras_id in settings.get("oras_ids", [])
+    }
+
+
 # ------------------------------------------------------------------------
-# CutremurSensor
+# InfProSensorBase
 # ------------------------------------------------------------------------
-class CutremurSensor(CoordinatorEntity, SensorEntity):
-    """Reprezentarea senzorului principal pentru cutremure."""
+class InfProSensorBase(CoordinatorEntity, SensorEntity, ABC):
+    """Bază comună pentru senzorii INFP alimentați de coordonator."""
 
-    def __init__(self, coordinator, oras_id, oras_nume):
+    # Secțiunea din payload-ul API de care depinde senzorul
+    _section = None
+    _attr_attribution = ATTRIBUTION
+    _unrecorded_attributes = STALE_ATTRIBUTES
+
+    def __init__(self, coordinator):
         """Inițializează senzorul."""
         super().__init__(coordinator)
-        self._oras_id = oras_id
-        self._oras_nume = oras_nume
-        self._attr_name = "Cutremur"
-        self._attr_unique_id = f"{DOMAIN}_cutremur"
         self._attributes = {"status": "Date în curs de actualizare"}
-        self._alerta = "Nu"
-
-        _LOGGER.debug(
-            "Senzor Cutremur inițializat: ID=%s, Nume oraș=%s",
-            self._attr_unique_id,
-            self._oras_nume,
-        )
+        self._last_available = None
+        self._last_value = None
 
     async def async_added_to_hass(self):
         """Se apelează când entitatea este adăugată în Home Assistant."""
         await super().async_added_to_hass()
+        self._async_update_from_coordinator()
+
+    @callback
+    def _handle_coordinator_update(self):
+        """
+        Ascultătorul unic înregistrat de CoordinatorEntity.
+
+        Rulează sincron în bucla de evenimente (fără task per entitate) și
+        reacționează doar dacă secțiunea proprie din payload s-a modificat.
+        """
+        if self.coordinator.section_changed(self._section):
+            start = time.perf_counter()
+            self._async_update_from_coordinator()
+            self.coordinator.metrics.record(PHASE_DISPATCH, time.perf_counter() - start)
+        elif self.available != self._last_available:
+            # S-a schimbat doar disponibilitatea (ex. revenire după o eroare)
+            self._last_available = self.available
+            self.async_write_ha_state()
 
-        def _schedule_coordinator_update():
-            self.hass.async_create_task(self._async_handle_coordinator_update())
+    @abstractmethod
+    @callback
+    def _async_update_from_coordinator(self):
+        """Recalculează starea senzorului din datele coordonatorului."""
+
+    @callback
+    def _async_write_if_changed(self, attributes):
+        """Scrie starea doar dacă valoarea sau atributele calculate diferă de cele curente."""
+        if self.coordinator.is_stale and self.coordinator.data_fetched_at:
+            # Pornire din cache sau API indisponibil: semnalăm vechimea datelor
+            # până la prima actualizare reușită
+            label = (
+                "Date învechite (descărcate la)"
+                if self.coordinator.degraded
+                else "Date din cache (descărcate la)"
+            )
+            attributes = {
+                **attributes,
+                label: self.coordinator.data_fetched_at.isoformat(),
+            }
+        value = self.native_value
+        if (
+            attributes == self._attributes
+            and self.available == self._last_available
+            and value == self._last_value
+        ):
+            return
+        self._attributes = attributes
+        self._last_available = self.available
+        self._last_value = value
+        self.async_write_ha_state()
 
-        self.async_on_remove(
-            self.coordinator.async_add_listener(_schedule_coordinator_update)
-        )
+    @property
+    def extra_state_attributes(self):
+        """Returnează atributele suplimentare pentru senzor."""
+        return self._attributes
 
-        await self._async_handle_coordinator_update()
+    @property
+    def device_info(self):
+        """Informații despre dispozitiv."""
+        return {
+            "identifiers": {(DOMAIN, "cutremur")},
+            "name": "Cutremur România (INFP)",
+            "manufacturer": "Institutul Național pentru Fizica Pământului",
+            "model": "Monitorizare Seisme",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+
+# ------------------------------------------------------------------------
+# CutremurSensor
+# ------------------------------------------------------------------------
+class CutremurSensor(InfProSensorBase):
+    """Reprezentarea senzorului principal pentru cutremure."""
+
+    _section = "date_cutremur"
+    _unrecorded_attributes = STALE_ATTRIBUTES | EVENT_UNRECORDED_ATTRIBUTES
+
+    def __init__(self, coordinator):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._attr_name = "Cutremur"
+        self._attr_unique_id = f"{DOMAIN}_cutremur"
+
+        _LOGGER.debug("Senzor Cutremur inițializat: ID=%s", self._attr_unique_id)
 
-    async def _async_handle_coordinator_update(self):
+    async def async_added_to_hass(self):
+        """Se abonează și la motorul de alerte, pentru atributul „Alerta”."""
+        await super().async_added_to_hass()
+        # Alerta poate porni pe un payload în care s-a schimbat doar
+        # `analiza_cutremur`, fără ca secțiunea proprie să se modifice
+        if self.coordinator.alerts is not None:
+            self.async_on_remove(
+                self.coordinator.alerts.async_add_listener(self._async_update_from_coordinator)
+            )
+
+    @callback
+    def _async_update_from_coordinator(self):
         """Actualizează datele senzorului."""
         data = self.coordinator.data
 
-        if not data or "date_cutremur" not in data:
+        if not data or data.event is None:
             _LOGGER.debug("Nu există date valide în coordinator pentru cutremur.")
-            self._attributes = {"status": "Date în curs de actualizare"}
-            self.async_write_ha_state()
+            self._async_write_if_changed({"status": "Date în curs de actualizare"})
             return
 
-        event_data = data["date_cutremur"]
+        event = data.event
+
+        # „Alerta” indică dacă evenimentul curent a depășit pragurile de alertă
+        alerts = self.coordinator.alerts
+        alerta = alerts is not None and alerts.last_alert_smevid == event.smevid
 
         # Actualizăm atributele senzorului cu informațiile din `date_cutremur`
-        self._attributes = {
-            "ID eveniment": event_data.get("smevid", "N/A"),
-            "Magnitudine (ML)": event_data.get("mag_ml", "N/A"),
-            "Magnitudinea Momentului (Mw)": event_data.get("mag_mw", "N/A"),
-            "Ora locală": event_data.get("local_time", "N/A"),
-            "Latitudine": event_data.get("elat", "N/A"),
-            "Longitudine": event_data.get("elon", "N/A"),
-            "Adâncime (km)": event_data.get("depth", "N/A"),
-            "Zonă": event_data.get("location", "N/A"),
-            "Intensitate": INTENSITY_MAP.get(event_data.get("intensity", "N/A"), "Necunoscută"),
-            "Alerta": self._alerta,
-            "attribution": ATTRIBUTION,
+        attributes = {
+            **_event_attributes(event),
+            "Alerta": "Da" if alerta else "Nu",
         }
-
-        self._alerta = "Da" if event_data.get("smevid") != self._attributes.get("ID eveniment") else "Nu"
-        self.async_write_ha_state()
+        self._async_write_if_changed(attributes)
 
     @property
     def native_value(self):
         """Returnează valoarea principală a senzorului (magnitudinea ML)."""
         data = self.coordinator.data
-        if data and "date_cutremur" in data:
-            event_data = data["date_cutremur"]
-            return event_data.get("mag_ml", "N/A")
+        if data and data.event is not None:
+            return _or_na(data.event.mag_ml)
         return "N/A"
 
-    @property
-    def extra_state_attributes(self):
-        """Returnează atributele suplimentare pentru senzor."""
-        return self._attributes
-
     @property
     def icon(self):
         """Pictograma senzorului."""
         return "mdi:waves"
 
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv."""
-        return {
-            "identifiers": {(DOMAIN, "cutremur")},
-            "name": "Cutremur România (INFP)",
-            "manufacturer": "Institutul Național pentru Fizica Pământului",
-            "model": "Monitorizare Seisme",
-            "entry_type": DeviceEntryType.SERVICE,
+
+# ------------------------------------------------------------------------
+# ProximitateCutremure
+# ------------------------------------------------------------------------
+class ProximitateCutremure(InfProSensorBase):
+    """
+    Numărul de evenimente din istoric aflate în jurul zonei „home”.
+
+    Interogarea folosește indexul spațial al istoricului (rază + fereastră de timp);
+    rulează la fiecare eveniment nou și periodic, pentru expirarea evenimentelor vechi.
+    """
+
+    _section = "date_cutremur"
+
+    def __init__(self, coordinator, raza_km, zile, magnitudine_minima):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._raza_km = raza_km
+        self._zile = zile
+        self._magnitudine_minima = magnitudine_minima
+        self._attr_name = "Cutremure în apropiere"
+        self._attr_unique_id = f"{DOMAIN}_proximitate"
+        self._state = None
+
+    async def async_added_to_hass(self):
+        """Pornește recalcularea periodică (evenimentele ies din fereastră odată cu trecerea timpului)."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_tick, timedelta(minutes=10)
+            )
+        )
+
+    @callback
+    def _async_tick(self, _now):
+        self._async_update_from_coordinator()
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Recalculează numărul de evenimente din raza configurată."""
+        lat = self.hass.config.latitude
+        lon = self.hass.config.longitude
+        history = self.coordinator.history
+
+        if history is None or lat is None or lon is None:
+            self._state = None
+            self._async_write_if_changed({"status": "Date în curs de actualizare"})
+            return
+
+        since = dt_util.utcnow().timestamp() - self._zile * 86400
+        results = history.query(lat, lon, self._raza_km, since, self._magnitudine_minima)
+        self._state = len(results)
+
+        attributes = {
+            "Rază (km)": self._raza_km,
+            "Fereastră (zile)": self._zile,
+            "Magnitudine minimă": self._magnitudine_minima,
         }
+        if results:
+            distance, closest = results[0]
+            latest = max(results, key=lambda item: item[1].timestamp or 0.0)[1]
+            attributes.update({
+                "Cel mai apropiat (ID eveniment)": closest.smevid,
+                "Cel mai apropiat (km)": round(distance, 1),
+                "Ultimul eveniment (ID)": latest.smevid,
+                "Ultimul eveniment (ora locală)": _or_na(latest.local_time),
+            })
+        self._async_write_if_changed(attributes)
 
+    @property
+    def native_value(self):
+        """Returnează numărul de evenimente găsite."""
+        return self._state
 
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:map-marker-alert"
 
 
 # ------------------------------------------------------------------------
 # RecordCutremurSensor
 # ------------------------------------------------------------------------
-class RecordCutremurSensor(CoordinatorEntity, SensorEntity):
+class RecordCutremurSensor(InfProSensorBase):
     """
     Senzor secundar care preia datele din `record_cutremur` din API.
     """
 
+    _section = "record_cutremur"
+    _unrecorded_attributes = STALE_ATTRIBUTES | EVENT_UNRECORDED_ATTRIBUTES
+
     def __init__(self, coordinator):
         """Inițializează senzorul."""
         super().__init__(coordinator)
         self._attr_name = "Record cutremur"
         self._attr_unique_id = f"{DOMAIN}_record_cutremur"
         self._state = "N/A"  # Magnitudinea ML
-        self._attributes = {"status": "Date în curs de actualizare"}
         self._available = True
 
-    async def async_added_to_hass(self):
-        """Se apelează când entitatea este adăugată în Home Assistant."""
-        await super().async_added_to_hass()
-
-        def _schedule_coordinator_update():
-            self.hass.async_create_task(self._async_handle_coordinator_update())
-
-        self.async_on_remove(
-            self.coordinator.async_add_listener(_schedule_coordinator_update)
-        )
-
-        await self._async_handle_coordinator_update()
-
-    async def _async_handle_coordinator_update(self):
+    @callback
+    def _async_update_from_coordinator(self):
         """Actualizează senzorul cu datele din API."""
         data = self.coordinator.data
 
-        if not data or "record_cutremur" not in data:
+        if not data or data.record is None:
             _LOGGER.debug("Nu există date valide pentru record_cutremur.")
             self._state = "N/A"
-            self._attributes = {"status": "Date în curs de actualizare"}
-            self.async_write_ha_state()
+            self._async_write_if_changed({"status": "Date în curs de actualizare"})
             return
 
-        record_data = data["record_cutremur"]
+        record = data.record
 
         # Actualizăm atributele senzorului cu informațiile din `record_cutremur`
-        self._state = record_data.get("new_mag_ml", "N/A")
-        self._attributes = {
-            "ID eveniment": record_data.get("new_smevid", "N/A"),
-            "Magnitudine (ML)": record_data.get("new_mag_ml", "N/A"),
-            "Magnitudinea Momentului (Mw)": record_data.get("mag_mw", "N/A"),
-            "Ora locală": record_data.get("local_time", "N/A"),
-            "Latitudine": record_data.get("elat", "N/A"),
-            "Longitudine": record_data.get("elon", "N/A"),
-            "Adâncime (km)": record_data.get("depth", "N/A"),
-            "Zonă": record_data.get("location", "N/A"),
-            "Intensitate": INTENSITY_MAP.get(record_data.get("intensity", "N/A"), "Necunoscută"),
-            "attribution": ATTRIBUTION,
-        }
+        self._state = _or_na(record.mag_ml)
+        attributes = _event_attributes(record)
 
         _LOGGER.debug(
             "RecordCutremurSensor a încărcat date: ID=%s, ML=%s",
-            self._attributes.get("ID eveniment", "N/A"),
+            attributes.get("ID eveniment", "N/A"),
             self._state,
         )
 
         self._available = True
-        self.async_write_ha_state()
+        self._async_write_if_changed(attributes)
 
     @property
     def native_value(self):
         """Returnează valoarea principală a senzorului (magnitudinea ML)."""
         return self._state
 
-    @property
-    def extra_state_attributes(self):
-        """Returnează atributele suplimentare pentru senzor."""
-        return self._attributes
-
     @property
     def available(self):
         """Returnează dacă senzorul este disponibil."""
@@ -225,98 +486,218 @@ class RecordCutremurSensor(CoordinatorEntity, SensorEntity):
         """Pictograma senzorului."""
         return "mdi:waves-arrow-up"
 
+
+# ------------------------------------------------------------------------
+# Senzori numerici (statistici pe termen lung)
+# ------------------------------------------------------------------------
+class EventValueSensor(InfProSensorBase):
+    """O valoare numerică a evenimentului curent (`date_cutremur`), fără atribute."""
+
+    _section = "date_cutremur"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, key, name, unit, device_class):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._key = key
+        self._attr_name = name
+        self._attr_unique_id = f"{DOMAIN}_cutremur_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._state = None
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Citește valoarea din evenimentul curent."""
+        data = self.coordinator.data
+        event = data.event if data else None
+        self._state = getattr(event, self._key) if event is not None else None
+        self._async_write_if_changed({})
+
     @property
-    def device_info(self):
-        """Informații despre dispozitiv."""
-        return {
-            "identifiers": {(DOMAIN, "cutremur")},
-            "name": "Cutremur România (INFP)",
-            "manufacturer": "Institutul Național pentru Fizica Pământului",
-            "model": "Monitorizare Seisme",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+    def native_value(self):
+        """Returnează valoarea (None dacă lipsește)."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:waves"
+
+
+class CityValueSensor(InfProSensorBase):
+    """O valoare numerică din `analiza_cutremur` pentru un oraș, fără atribute."""
+
+    _section = "analiza_cutremur"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self, coordinator, oras_id, oras_nume, key, name, unit, device_class, enabled=True
+    ):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._key = key
+        self._oras_key = normalize_oras_id(oras_id)
+        self._attr_name = f"{name} {oras_nume}"
+        self._attr_unique_id = f"{DOMAIN}_analiza_{key}_{oras_id}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_entity_registry_enabled_default = enabled
+        self._state = None
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Citește valoarea din rândul orașului."""
+        row = self.coordinator.analiza_by_oras.get(self._oras_key)
+        self._state = getattr(row, self._key) if row is not None else None
+        self._async_write_if_changed({})
+
+    @property
+    def native_value(self):
+        """Returnează valoarea (None dacă lipsește)."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:chart-bar"
+
+
+# ------------------------------------------------------------------------
+# StatisticiCutremure
+# ------------------------------------------------------------------------
+WINDOW_NAMES = {"24h": "24 de ore", "7z": "7 zile", "30z": "30 de zile", "365z": "365 de zile"}
+
+
+class StatisticiCutremure(InfProSensorBase):
+    """
+    Numărul de cutremure dintr-o fereastră glisantă, cu agregatele ca atribute.
+
+    Agregatele sunt menținute incremental de istoric; senzorul doar le citește,
+    la fiecare eveniment nou și periodic (pentru expirarea evenimentelor vechi).
+    """
+
+    _section = "date_cutremur"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, window):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._window = window
+        self._attr_name = f"Cutremure în ultimele {WINDOW_NAMES.get(window, window)}"
+        self._attr_unique_id = f"{DOMAIN}_statistici_{window}"
+        self._state = None
+
+    async def async_added_to_hass(self):
+        """Pornește recalcularea periodică."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_tick, timedelta(minutes=10)
+            )
+        )
+
+    @callback
+    def _async_tick(self, _now):
+        self._async_update_from_coordinator()
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Citește agregatele ferestrei."""
+        window = self.coordinator.history.aggregates.window(
+            self._window, dt_util.utcnow().timestamp()
+        )
+        self._state = len(window)
+
+        def _round(value, digits):
+            return None if value is None else round(value, digits)
+
+        self._async_write_if_changed({
+            "Magnitudine maximă (ML)": _or_na(window.max_ml),
+            "Magnitudine maximă (Mw)": _or_na(window.max_mw),
+            "Energie eliberată (J)": _round(window.energy, 0) if window.energy else 0,
+            "Magnitudine echivalentă energiei": _or_na(_round(window.energy_magnitude, 2)),
+            "Adâncime medie (km)": _or_na(_round(window.mean_depth, 1)),
+        })
+
+    @property
+    def native_value(self):
+        """Returnează numărul de cutremure din fereastră."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:chart-timeline-variant"
 
 
 # ------------------------------------------------------------------------
 # AnalizaDate
 # ------------------------------------------------------------------------
-class AnalizaDate(CoordinatorEntity, SensorEntity):
+class AnalizaDate(InfProSensorBase):
     """Senzor care folosește datele din analiza_cutremur."""
 
+    _section = "analiza_cutremur"
+    # Orașul și județul nu se schimbă; valorile numerice au senzori proprii
+    _unrecorded_attributes = STALE_ATTRIBUTES | frozenset({
+        "Oraș",
+        "Județ",
+        "Distanță (km)",
+        "Accelerația maximă a solului",
+        "Viteza maximă a solului",
+        "Intensitatea accelerației",
+    })
+
     def __init__(self, coordinator, oras_id, oras_nume):
         """Inițializează senzorul DateAnaliza."""
+        from .orase import JUDETE_MAP
+
         super().__init__(coordinator)
+        self._judete = JUDETE_MAP
         self._oras_id = oras_id
         self._oras_nume = oras_nume
-        self._attr_name = "Analiză date"
+        self._oras_key = normalize_oras_id(oras_id)
+        self._attr_name = f"Analiză date {oras_nume}"
         self._attr_unique_id = f"{DOMAIN}_analiza_date_{oras_id}"
         self._attributes = {}
         self._available = True
 
-    async def async_added_to_hass(self):
-        """Se apelează când entitatea este adăugată în Home Assistant."""
-        await super().async_added_to_hass()
-
-        def _schedule_coordinator_update():
-            self.hass.async_create_task(self._async_handle_coordinator_update())
-
-        self.async_on_remove(
-            self.coordinator.async_add_listener(_schedule_coordinator_update)
-        )
-
-        await self._async_handle_coordinator_update()
-
-    async def _async_handle_coordinator_update(self):
+    @callback
+    def _async_update_from_coordinator(self):
         """Actualizează datele senzorului."""
         data = self.coordinator.data
 
-        if not data or "analiza_cutremur" not in data:
-            self._attributes = {"status": "Date în curs de actualizare"}
-            self._available = True  # Senzorul rămâne disponibil
-            self.async_write_ha_state()
-            return
-
-        analiza = data["analiza_cutremur"]
-
-        if not isinstance(analiza, list) or not analiza:
-            self._attributes = {"status": "Date în curs de actualizare"}
+        if not data or not data.analiza:
             self._available = True  # Senzorul rămâne disponibil
-            self.async_write_ha_state()
+            self._async_write_if_changed({"status": "Date în curs de actualizare"})
             return
 
-        # Găsește datele pentru orașul specificat (oras_id)
-        oras_data = next((item for item in analiza if str(item.get("oras_id")) == str(self._oras_id)), None)
+        # Găsește datele pentru orașul specificat (oras_id), prin indexul coordonatorului
+        oras_data = self.coordinator.analiza_by_oras.get(self._oras_key)
 
         if not oras_data:
-            self._attributes = {"status": "Date în curs de actualizare"}
             self._available = True  # Senzorul rămâne disponibil
-            self.async_write_ha_state()
+            self._async_write_if_changed({"status": "Date în curs de actualizare"})
             return
 
         # Populează atributele senzorului cu informațiile relevante
-        self._attributes = {
-            "Oraș": oras_data.get("oras", "N/A"),
-            "Județ": JUDETE_MAP.get(oras_data.get("judet", "N/A"), "N/A"),
-            "Distanță (km)": oras_data.get("distanta_km", "N/A"),
-            "Accelerația maximă a solului": oras_data.get("pga", "N/A"),
-            "Viteza maximă a solului": oras_data.get("pgv", "N/A"),
-            "Intensitate": INTENSITY_MAP.get(oras_data.get("intensitate", "N/A"), "Necunoscută"),
-            "Intensitatea accelerației": oras_data.get("iacc", "N/A"),
-            "attribution": ATTRIBUTION,
+        attributes = {
+            "Oraș": _or_na(oras_data.oras),
+            "Județ": self._judete.get(oras_data.judet, "N/A"),
+            "Distanță (km)": _or_na(oras_data.distanta_km),
+            "Accelerația maximă a solului": _or_na(oras_data.pga),
+            "Viteza maximă a solului": _or_na(oras_data.pgv),
+            "Intensitate": oras_data.intensitate_text,
+            "Intensitatea accelerației": _or_na(oras_data.iacc),
         }
         self._available = True
-        self.async_write_ha_state()
+        self._async_write_if_changed(attributes)
 
     @property
     def native_value(self):
         """Returnează valoarea principală a senzorului (numele orașului)."""
         return self._oras_nume
 
-    @property
-    def extra_state_attributes(self):
-        """Returnează atributele suplimentare pentru senzor."""
-        return self._attributes
-
     @property
     def available(self):
         """Returnează dacă senzorul este disponibil."""
@@ -327,13 +708,200 @@ class AnalizaDate(CoordinatorEntity, SensorEntity):
         """Pictograma senzorului."""
         return "mdi:chart-bar"
 
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv."""
-        return {
-            "identifiers": {(DOMAIN, "cutremur")},
-            "name": "Cutremur România (INFP)",
-            "manufacturer": "Institutul Național pentru Fizica Pământului",
-            "model": "Monitorizare Seisme",
-            "entry_type": DeviceEntryType.SERVICE,
+
+# ------------------------------------------------------------------------
+# ImpactLocal
+# ------------------------------------------------------------------------
+class ImpactLocal(InfProSensorBase):
+    """Senzor cu impactul estimat local (distanță, PGA, PGV, intensitate) într-un punct."""
+
+    _section = "date_cutremur"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = STALE_ATTRIBUTES | frozenset({"Punct", "Sursa"})
+
+    def __init__(self, coordinator, site_name):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._site_name = site_name
+        self._attr_name = f"Impact estimat {site_name}"
+        self._attr_unique_id = f"{DOMAIN}_impact_{slugify(site_name)}"
+        self._state = None
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Actualizează senzorul cu estimarea calculată de coordonator."""
+        estimate = self.coordinator.impact.get(self._site_name)
+
+        if estimate is None:
+            self._state = None
+            self._async_write_if_changed({"status": "Date în curs de actualizare"})
+            return
+
+        # Rotunjirea se face doar la afișare; calculul păstrează precizia completă
+        self._state = round(estimate.intensity, 1)
+        attributes = {
+            "Punct": self._site_name,
+            "Distanță epicentrală (km)": round(estimate.epicentral_km, 1),
+            "Distanță hipocentrală (km)": round(estimate.hypocentral_km, 1),
+            "Accelerația maximă a solului (g)": round(estimate.pga_g, 4),
+            "Viteza maximă a solului (cm/s)": round(estimate.pgv_cms, 2),
+            "Intensitate": INTENSITY_MAP.get(estimate.intensity_roman, "Necunoscută"),
+            "Sursa": "Estimare locală (Campbell 1981, Wald et al. 1999)",
         }
+        self._async_write_if_changed(attributes)
+
+    @property
+    def native_value(self):
+        """Returnează intensitatea estimată (scara MMI)."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:map-marker-radius"
+
+
+# ------------------------------------------------------------------------
+# Senzori de diagnostic
+# ------------------------------------------------------------------------
+PHASE_NAMES = {
+    "dns": "rezolvare DNS",
+    "connect": "conectare",
+    "ttfb": "primul octet",
+    "download": "descărcare",
+    "parse": "parsare",
+    "dispatch": "actualizare entitate",
+}
+
+
+class InfProDiagnosticSensor(InfProSensorBase):
+    """
+    Bază pentru senzorii de diagnostic ai căii de actualizare.
+
+    Valorile se schimbă și fără date noi (ex. răspunsuri 304), așa că
+    senzorii se recalculează periodic, nu doar la notificările coordonatorului.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._attributes = {}
+        self._state = None
+
+    async def async_added_to_hass(self):
+        """Pornește recalcularea periodică."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_tick, timedelta(seconds=60)
+            )
+        )
+
+    @callback
+    def _async_tick(self, _now):
+        self._async_update_from_coordinator()
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Recalculează la fiecare notificare a coordonatorului."""
+        self._async_update_from_coordinator()
+
+    @property
+    def native_value(self):
+        """Returnează valoarea senzorului."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:timer-outline"
+
+
+class DiagnosticaFaza(InfProDiagnosticSensor):
+    """Durata unei faze a actualizării (p50, cu p95/p99 ca atribute)."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+
+    def __init__(self, coordinator, phase):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._phase = phase
+        self._attr_name = f"Durată {PHASE_NAMES[phase]}"
+        self._attr_unique_id = f"{DOMAIN}_diagnostic_{phase}"
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Actualizează percentilele fazei."""
+        summary = self.coordinator.metrics.phase_summary(self._phase)
+        self._state = summary["p50_ms"]
+        self._async_write_if_changed({
+            "p95 (ms)": summary["p95_ms"],
+            "p99 (ms)": summary["p99_ms"],
+            "Eșantioane": summary["esantioane"],
+            "Total măsurători": summary["total"],
+        })
+
+
+class DiagnosticaCereri(InfProDiagnosticSensor):
+    """Numărul cererilor API, cu rata 304, rata modificărilor și erorile."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._attr_name = "Cereri API"
+        self._attr_unique_id = f"{DOMAIN}_diagnostic_cereri"
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Actualizează contoarele."""
+        metrics = self.coordinator.metrics
+        self._state = metrics.requests
+
+        def _percent(rate):
+            return None if rate is None else round(rate * 100, 1)
+
+        self._async_write_if_changed({
+            "Răspunsuri 200": metrics.responses_200,
+            "Răspunsuri 304": metrics.responses_304,
+            "Erori": metrics.errors,
+            "Rata 304 (%)": _percent(metrics.not_modified_rate),
+            "Rata modificărilor (%)": _percent(metrics.change_rate),
+            **{
+                f"Cache {key}": value
+                for key, value in self.coordinator.api.fetch_cache.stats.items()
+            },
+        })
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:counter"
+
+
+class DiagnosticaPayload(InfProDiagnosticSensor):
+    """Dimensiunea ultimului payload descărcat."""
+
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+
+    def __init__(self, coordinator):
+        """Inițializează senzorul."""
+        super().__init__(coordinator)
+        self._attr_name = "Dimensiune payload"
+        self._attr_unique_id = f"{DOMAIN}_diagnostic_payload"
+
+    @callback
+    def _async_update_from_coordinator(self):
+        """Actualizează dimensiunea payload-ului."""
+        self._state = self.coordinator.metrics.payload_bytes
+        self._async_write_if_changed({})
+
+    @property
+    def icon(self):
+        """Pictograma senzorului."""
+        return "mdi:file-download-outline"
@@ -0,0 +1,493 @@
+"""Surse multiple de evenimente (oglinda INFP, fluxuri GeoJSON EMSC/USGS, fișiere locale)."""
+from abc import ABC, abstractmethod
+import asyncio
+from datetime import datetime
+import logging
+import os
+import time
+from urllib.parse import urlparse
+
+import async_timeout
+from aiohttp import ClientSession
+import voluptuous as vol
+
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .api import InfProApiClient
+from .breaker import CircuitBreaker, CircuitOpenError
+from .const import (
+    MERGE_DISTANCE_TOLERANCE,
+    MERGE_TIME_TOLERANCE,
+    SOURCE_MAX_EVENTS,
+    SOURCE_TIMEOUT,
+)
+from .models import TIMEZONE_RO, EarthquakeEvent, InfProPayload, parse_payload
+from .spatial import haversine_km
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_INFP = "infp"
+
+
+class SourceResult:
+    """Rezultatul unei surse: evenimentele normalizate și, pentru INFP, payload-ul complet."""
+
+    __slots__ = ("events", "payload")
+
+    def __init__(self, events, payload=None):
+        """Inițializează rezultatul."""
+        self.events = events
+        self.payload = payload
+
+
+class EventSource(ABC):
+    """Sursa de bază: un flux de evenimente interogat cu un timeout și un circuit breaker propriu."""
+
+    def __init__(self, name, timeout=SOURCE_TIMEOUT):
+        """Inițializează sursa."""
+        self.name = name
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(name)
+
+    @abstractmethod
+    async def async_fetch(self) -> SourceResult:
+        """Descarcă și normalizează evenimentele sursei."""
+
+
+class InfProSource(EventSource):
+    """Oglinda INFP (`URL_CUTREMUR`), prin clientul API existent."""
+
+    def __init__(self, client: InfProApiClient):
+        """Inițializează sursa (timeout-ul și circuitul sunt ale clientului INFP)."""
+        super().__init__(SOURCE_INFP, client.timeout)
+        self.client = client
+        self.breaker = client.breaker
+
+    async def async_fetch(self):
+        """Payload-ul curent INFP (inclusiv la 304)."""
+        payload = await self.client.async_fetch_payload()
+        return SourceResult([payload.event] if payload.event else [], payload)
+
+
+class GeoJsonSource(EventSource):
+    """Flux GeoJSON de tip FDSN (EMSC `format=json`, USGS `format=geojson`)."""
+
+    def __init__(self, session: ClientSession, url, name=None, timeout=SOURCE_TIMEOUT):
+        """Inițializează sursa."""
+        super().__init__(name or source_name(url), timeout)
+        self._session = session
+        self.url = url
+
+    async def async_fetch(self):
+        """Descarcă fluxul și îl normalizează."""
+        async with self._session.get(self.url) as response:
+            response.raise_for_status()
+            body = await response.read()
+        return SourceResult(parse_geojson(json_loads(body), self.name))
+
+
+class FileSource(EventSource):
+    """Fișier local, în formatul INFP (`date_cutremur`) sau GeoJSON."""
+
+    def __init__(self, hass, path, timeout=SOURCE_TIMEOUT):
+        """Inițializează sursa."""
+        super().__init__("fisier", timeout)
+        self._hass = hass
+        self.path = path
+
+    def _load(self):
+        with open(self.path, "rb") as file:
+            data = json_loads(file.read())
+        if isinstance(data, dict) and "features" in data:
+            return SourceResult(parse_geojson(data, self.name))
+        payload = parse_payload(data)
+        return SourceResult([payload.event] if payload.event else [])
+
+    async def async_fetch(self):
+        """Citește fișierul în executor."""
+        return await self._hass.async_add_executor_job(self._load)
+
+
+def source_name(url):
+    """Numele scurt al unei surse, folosit ca prefix al ID-urilor de eveniment."""
+    host = (urlparse(url).hostname or "").lower()
+    for known in ("emsc", "seismicportal", "usgs"):
+        if known in host:
+            return "emsc" if known == "seismicportal" else known
+    return host or "geojson"
+
+
+def _feature_time(value):
+    """Timestamp UTC din `time` (USGS: milisecunde epoch; EMSC: ISO 8601)."""
+    if isinstance(value, (int, float)):
+        return value / 1000
+    moment = dt_util.parse_datetime(str(value or ""))
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_util.UTC)
+    return moment.timestamp()
+
+
+def parse_geojson(data, name):
+    """
+    Normalizează o colecție GeoJSON FDSN în evenimente, cu ID-uri prefixate
+    cu numele sursei (ex. `emsc:20250120_0000123`).
+
+    Ora este convertită în ora României, ca în `date_cutremur`.
+    """
+    features = data.get("features") if isinstance(data, dict) else None
+    if not isinstance(features, list):
+        raise vol.Invalid("Fluxul GeoJSON nu conține `features`")
+
+    timezone = dt_util.get_time_zone(TIMEZONE_RO)
+    events = []
+    invalid = 0
+    for feature in features[:SOURCE_MAX_EVENTS]:
+        properties = feature.get("properties") or {}
+        coordinates = (feature.get("geometry") or {}).get("coordinates") or []
+        event_id = properties.get("unid") or feature.get("id") or properties.get("source_id")
+        timestamp = _feature_time(properties.get("time"))
+        if not event_id or timestamp is None:
+            invalid += 1
+            continue
+
+        magnitude_type = str(properties.get("magtype") or properties.get("magType") or "").lower()
+        depth = properties.get("depth")
+        if depth is None and len(coordinates) > 2 and coordinates[2] is not None:
+            # EMSC raportează adâncimea negativă în geometrie, USGS pozitivă
+            depth = abs(coordinates[2])
+        record = {
+            "smevid": f"{name}:{event_id}",
+            "local_time": datetime.fromtimestamp(timestamp, timezone).strftime("%Y-%m-%d %H:%M:%S"),
+            "mag_mw" if magnitude_type.startswith("mw") else "mag_ml": properties.get("mag"),
+            "elat": properties.get("lat", coordinates[1] if len(coordinates) > 1 else None),
+            "elon": properties.get("lon", coordinates[0] if coordinates else None),
+            "depth": depth,
+            "location": properties.get("flynn_region") or properties.get("place"),
+        }
+        try:
+            events.append(EarthquakeEvent.from_payload(record, received=timestamp))
+        except vol.Invalid:
+            invalid += 1
+    if invalid:
+        _LOGGER.debug("%s evenimente invalide ignorate din sursa %s.", invalid, name)
+    return events
+
+
+def parse_sources(text):
+    """
+    Interpretează sursele suplimentare, câte una pe linie: URL GeoJSON sau cale absolută.
+
+    :raises ValueError: dacă o linie nu este nici URL http(s), nici cale absolută.
+    """
+    sources = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith(("http://", "https://")) and not os.path.isabs(line):
+            raise ValueError(f"Sursă invalidă: {line}")
+        sources.append(line)
+    return sources
+
+
+def create_sources(hass, session, text):
+    """Creează sursele suplimentare configurate (listă goală dacă nu există)."""
+    try:
+        lines = parse_sources(text)
+    except ValueError as err:
+        _LOGGER.error("Sursele suplimentare configurate sunt invalide: %s", err)
+        return []
+    return [
+        GeoJsonSource(session, line) if line.startswith(("http://", "https://"))
+        else FileSource(hass, line)
+        for line in lines
+    ]
+
+
+class _Cluster:
+    """Copiile aceluiași cutremur raportate de surse diferite."""
+
+    __slots__ = ("smevid", "copies", "merged")
+
+    def __init__(self, smevid):
+        self.smevid = smevid
+        # Prioritatea sursei -> evenimentul raportat de ea
+        self.copies = {}
+        self.merged = None
+
+    def merge(self):
+        """Câmpurile sursei cu prioritate maximă; ID-ul rămâne al primei surse care l-a raportat."""
+        values = {}
+        for priority in sorted(self.copies):
+            for key, value in self.copies[priority].as_dict().items():
+                if values.get(key) is None:
+                    values[key] = value
+        values["smevid"] = self.smevid
+        self.merged = EarthquakeEvent.from_dict(values)
+
+
+class EventMerger:
+    """
+    Comasează evenimentele aproape identice raportate de surse diferite.
+
+    Două evenimente sunt același cutremur dacă diferența de timp și distanța
+    dintre epicentre sunt sub toleranțe. ID-ul evenimentului comasat este al
+    primei surse care l-a raportat, astfel încât istoricul și alertele nu îl
+    tratează de două ori; câmpurile vin de la sursa cu prioritatea cea mai mare.
+    """
+
+    def __init__(
+        self,
+        time_tolerance=MERGE_TIME_TOLERANCE,
+        distance_tolerance=MERGE_DISTANCE_TOLERANCE,
+        size=SOURCE_MAX_EVENTS,
+    ):
+        """Inițializează comasarea."""
+        self.time_tolerance = time_tolerance
+        self.distance_tolerance = distance_tolerance
+        self._size = size
+        self._clusters = []
+        # (prioritate, smevid raportat) -> cluster
+        self._by_id = {}
+
+    def _is_duplicate(self, cluster, priority, event):
+        copy = cluster.copies.get(priority)
+        if copy is not None:
+            # O sursă nu raportează de două ori același cutremur
+            return False
+        reference = cluster.merged
+        if reference.timestamp is None or event.timestamp is None:
+            return False
+        if abs(reference.timestamp - event.timestamp) > self.time_tolerance:
+            return False
+        if None in (reference.elat, reference.elon, event.elat, event.elon):
+            return True
+        return (
+            haversine_km(reference.elat, reference.elon, event.elat, event.elon)
+            <= self.distance_tolerance
+        )
+
+    def add(self, priority, events):
+        """Adaugă evenimentele unei surse (prioritate mică = sursă preferată)."""
+        for event in events:
+            cluster = self._by_id.get((priority, event.smevid))
+            if cluster is None:
+                cluster = next(
+                    (
+                        candidate for candidate in reversed(self._clusters)
+                        if self._is_duplicate(candidate, priority, event)
+                    ),
+                    None,
+                )
+                if cluster is None:
+                    cluster = _Cluster(event.smevid)
+                    self._clusters.append(cluster)
+                else:
+                    _LOGGER.debug(
+                        "Evenimentul %s comasat cu %s.", event.smevid, cluster.smevid
+                    )
+                self._by_id[(priority, event.smevid)] = cluster
+            cluster.copies[priority] = event
+            cluster.merge()
+        self._evict()
+
+    def _evict(self):
+        """Păstrează doar cele mai recente `size` clustere."""
+        if len(self._clusters) <= self._size:
+            return
+        self._clusters.sort(key=lambda cluster: cluster.merged.timestamp or 0)
+        removed = self._clusters[:-self._size]
+        self._clusters = self._clusters[-self._size:]
+        for cluster in removed:
+            for priority, copy in cluster.copies.items():
+                self._by_id.pop((priority, copy.smevid), None)
+
+    def cluster_of(self, priority, smevid):
+        """Clusterul în care a fost comasat evenimentul unei surse."""
+        return self._by_id.get((priority, smevid))
+
+    def latest(self):
+        """Clusterul celui mai recent cutremur."""
+        return max(
+            self._clusters,
+            key=lambda cluster: cluster.merged.timestamp or 0,
+            default=None,
+        )
+
+
+class MultiSourceClient:
+    """
+    Client care interoghează în paralel oglinda INFP și sursele suplimentare.
+
+    Fiecare sursă are un timeout propriu; o sursă lentă sau căzută nu
+    blochează celelalte. Evenimentele sunt comasate (`EventMerger`), iar un
+    cutremur nou raportat de oricare sursă este publicat imediat în
+    coordonator, fără a aștepta sursele rămase. Analiza pe orașe vine doar de
+    la INFP: până când INFP raportează același cutremur, payload-ul publicat
+    nu conține `analiza_cutremur`.
+
+    Interfața este aceeași cu a `InfProApiClient`.
+    """
+
+    def __init__(self, primary: InfProApiClient, sources, merger: EventMerger | None = None):
+        """Inițializează clientul."""
+        self._primary = primary
+        self.sources = (InfProSource(primary), *sources)
+        self._merger = merger or EventMerger()
+        self._infp_payload = None
+        self._last_payload = None
+        self._publisher = None
+        # Numele sursei -> starea ultimei interogări, pentru diagnostic
+        self.sources_status = {}
+
+    @property
+    def fetch_cache(self):
+        """Stratul single-flight al oglinzii INFP."""
+        return self._primary.fetch_cache
+
+    @property
+    def metrics(self):
+        """Metricile descărcărilor INFP."""
+        return self._primary.metrics
+
+    @property
+    def breaker(self):
+        """Circuit breaker-ul oglinzii INFP."""
+        return self._primary.breaker
+
+    @property
+    def validators(self):
+        """Validatorii HTTP ai oglinzii INFP."""
+        return self._primary.validators
+
+    def restore_validators(self, etag=None, last_modified=None, payload=None):
+        """Restaurează validatorii INFP și payload-ul salvat."""
+        self._primary.restore_validators(etag, last_modified, payload)
+        self._set_infp_payload(payload)
+        self._last_payload = payload
+
+    def set_publisher(self, publisher):
+        """Corutina apelată cu payload-ul, când o sursă raportează prima un cutremur nou."""
+        self._publisher = publisher
+
+    def _set_infp_payload(self, payload):
+        self._infp_payload = payload
+        if payload is not None and payload.event is not None:
+            self._merger.add(0, [payload.event])
+
+    async def _async_fetch_source(self, source):
+        """Interoghează o sursă; erorile sunt returnate, nu ridicate."""
+        start = time.perf_counter()
+        own_breaker = not isinstance(source, InfProSource)
+        try:
+            if own_breaker:
+                source.breaker.before_call()
+            async with async_timeout.timeout(source.timeout):
+                result = await source.async_fetch()
+        except asyncio.CancelledError:
+            # Proba întreruptă nu trebuie să blocheze circuitul în starea semideschisă
+            if own_breaker:
+                source.breaker.record_failure()
+            raise
+        except Exception as err:
+            if own_breaker and not isinstance(err, CircuitOpenError):
+                source.breaker.record_failure()
+            self.sources_status[source.name] = {
+                "ok": False,
+                "durata_ms": round((time.perf_counter() - start) * 1000, 1),
+                "eroare": str(err) or type(err).__name__,
+                "circuit": source.breaker.state,
+            }
+            _LOGGER.debug("Sursa %s a eșuat: %s", source.name, err)
+            return err
+        if own_breaker:
+            source.breaker.record_success()
+        self.sources_status[source.name] = {
+            "ok": True,
+            "durata_ms": round((time.perf_counter() - start) * 1000, 1),
+            "evenimente": len(result.events),
+            "circuit": source.breaker.state,
+        }
+        return result
+
+    def _build_payload(self):
+        """Payload-ul cu cel mai recent cutremur comasat."""
+        infp = self._infp_payload
+        latest = self._merger.latest()
+        if latest is None:
+            return infp
+        record = infp.record if infp is not None else None
+        if (
+            infp is not None
+            and infp.event is not None
+            and self._merger.cluster_of(0, infp.event.smevid) is latest
+        ):
+            return InfProPayload(latest.merged, record, infp.analiza)
+        # Cutremur încă neraportat de INFP: analiza existentă aparține altui eveniment
+        return InfProPayload(latest.merged, record, {})
+
+    async def async_fetch_data(self):
+        """
+        Interoghează toate sursele în paralel.
+
+        :return: Payload-ul comasat sau None dacă nu s-a modificat de la ultimul apel.
+        """
+        tasks = {
+            asyncio.ensure_future(self._async_fetch_source(source)): (priority, source)
+            for priority, source in enumerate(self.sources)
+        }
+        pending = set(tasks)
+        # Prioritatea sursei -> eroarea întâlnită
+        errors = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    priority, source = tasks[task]
+                    result = task.result()
+                    if isinstance(result, Exception):
+                        errors[priority] = result
+                        continue
+                    if priority == 0:
+                        self._set_infp_payload(result.payload)
+                    else:
+                        self._merger.add(priority, result.events)
+
+                if pending and self._publisher is not None:
+                    await self._async_publish_early()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if len(errors) == len(self.sources):
+            # Nicio sursă disponibilă: eroarea INFP decide back-off-ul (Retry-After)
+            raise errors[0]
+
+        payload = self._build_payload()
+        if payload is None or payload == self._last_payload:
+            return None
+        self._last_payload = payload
+        return payload
+
+    async def _async_publish_early(self):
+        """Publică un cutremur nou fără a aștepta sursele rămase."""
+        last_event = self._last_payload.event if self._last_payload is not None else None
+        if last_event is None:
+            # Fără un reper anterior nu știm dacă evenimentul este nou
+            return
+        payload = self._build_payload()
+        if (
+            payload is None
+            or payload.event is None
+            or payload.event.smevid == last_event.smevid
+            or (payload.event.timestamp or 0) <= (last_event.timestamp or 0)
+        ):
+            return
+        _LOGGER.debug(
+            "Cutremur nou (smevid=%s) publicat înaintea celorlalte surse.", payload.event.smevid
+        )
+        self._last_payload = payload
+        await self._publisher(payload)
@@ -0,0 +1,121 @@
+"""Index spațial (grilă lat/lon) pentru interogări de proximitate în istoric."""
+from bisect import bisect_left, insort
+import math
+
+# Raza medie a Pământului (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# Latura unei celule a grilei (în grade); ~111 km pe latitudine
+GRID_CELL_DEG = 1.0
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distanța ortodromică (km) între două puncte date în grade."""
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
+    half_dlat = (lat2 - lat1) * 0.5
+    half_dlon = math.radians(lon2 - lon1) * 0.5
+    value = (
+        math.sin(half_dlat) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin(half_dlon) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(value)))
+
+
+def event_magnitude(event):
+    """Magnitudinea folosită la filtrare: ML, sau Mw dacă ML lipsește."""
+    return event.mag_ml if event.mag_ml is not None else event.mag_mw
+
+
+class GridIndex:
+    """
+    Grilă de celule lat/lon, actualizată incremental.
+
+    Fiecare celulă păstrează evenimentele sortate după `timestamp`, astfel că
+    o interogare rază + fereastră de timp vizitează doar celulele care
+    intersectează cercul și doar evenimentele din fereastră.
+    """
+
+    def __init__(self, cell_deg=GRID_CELL_DEG):
+        """Inițializează indexul."""
+        self.cell_deg = cell_deg
+        # (rând, coloană) -> listă sortată de (timestamp, smevid, eveniment)
+        self._cells = {}
+        self._count = 0
+
+    def __len__(self):
+        """Numărul de evenimente indexate."""
+        return self._count
+
+    def _cell(self, lat, lon):
+        lon = (lon + 180.0) % 360.0 - 180.0
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    @staticmethod
+    def _entry(event):
+        return (event.timestamp or 0.0, event.smevid, event)
+
+    def add(self, event):
+        """Adaugă un eveniment (ignorat dacă nu are coordonate)."""
+        if event.elat is None or event.elon is None:
+            return
+        cell = self._cells.setdefault(self._cell(event.elat, event.elon), [])
+        # Evenimentele sosesc de regulă în ordine cronologică: adăugare la final
+        entry = self._entry(event)
+        if not cell or cell[-1][:2] <= entry[:2]:
+            cell.append(entry)
+        else:
+            insort(cell, entry, key=lambda item: item[:2])
+        self._count += 1
+
+    def query(self, lat, lon, radius_km, since=None, min_magnitude=None):
+        """
+        Evenimentele aflate la cel mult `radius_km` de (lat, lon).
+
+        :param since: timestamp UTC minim (opțional).
+        :param min_magnitude: magnitudinea minimă (opțional).
+        :return: listă de (distanță_km, eveniment), sortată după distanță.
+        """
+        lat_span = radius_km / KM_PER_DEG
+        row_min, col_min = self._cell(max(lat - lat_span, -90.0), lon)
+        row_max, _ = self._cell(min(lat + lat_span, 90.0), lon)
+
+        # Lățimea în longitudine se calculează la latitudinea cea mai depărtată de ecuator
+        widest = min(90.0, abs(lat) + lat_span)
+        cos_lat = math.cos(math.radians(widest))
+        columns = math.ceil(360.0 / self.cell_deg)
+        if cos_lat <= 1e-6:
+            col_span = columns
+        else:
+            col_span = math.ceil(radius_km / (KM_PER_DEG * cos_lat) / self.cell_deg)
+        col_offset = math.floor(-180.0 / self.cell_deg)
+        if 2 * col_span + 1 >= columns:
+            col_range = range(col_offset, col_offset + columns)
+        else:
+            # Normalizare peste meridianul de 180°
+            col_range = [
+                (column - col_offset) % columns + col_offset
+                for column in range(col_min - col_span, col_min + col_span + 1)
+            ]
+
+        since_key = (since,) if since is not None else None
+        results = []
+        for row in range(row_min, row_max + 1):
+            for column in col_range:
+                cell = self._cells.get((row, column))
+                if not cell:
+                    continue
+                start = 0
+                if since_key is not None:
+                    start = bisect_left(cell, since_key, key=lambda item: item[:1])
+                for _, _, event in cell[start:]:
+                    if min_magnitude is not None:
+                        magnitude = event_magnitude(event)
+                        if magnitude is None or magnitude < min_magnitude:
+                            continue
+                    distance = haversine_km(lat, lon, event.elat, event.elon)
+                    if distance <= radius_km:
+                        results.append((distance, event))
+        results.sort(key=lambda item: item[0])
+        return results
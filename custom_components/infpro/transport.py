@@ -0,0 +1,158 @@
+"""Transporturi de ingestie pentru integrarea INFP (interogare periodică sau flux SSE)."""
+import asyncio
+import logging
+import random
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, hdrs
+import voluptuous as vol
+
+from homeassistant.util.json import json_loads
+
+from .const import (
+    DOMAIN,
+    STREAM_HEARTBEAT_TIMEOUT,
+    STREAM_RECONNECT_MAX,
+    STREAM_RECONNECT_MIN,
+    TRANSPORT_POLLING,
+    TRANSPORT_SSE,
+)
+from .models import parse_payload
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class InfProTransport:
+    """
+    Transportul de bază: doar interogarea periodică a coordonatorului.
+
+    Transporturile de tip push livrează payload-uri direct în coordonator
+    (`async_push_payload`); interogarea periodică rămâne activă ca rezervă.
+    """
+
+    def __init__(self, coordinator):
+        """Inițializează transportul."""
+        self.coordinator = coordinator
+
+    def async_start(self, entry=None):
+        """Pornește transportul (nimic de făcut pentru interogarea periodică)."""
+
+    async def async_stop(self):
+        """Oprește transportul."""
+
+
+class SseTransport(InfProTransport):
+    """
+    Flux server-sent events: fiecare eveniment `data:` conține un payload
+    complet în formatul `URL_CUTREMUR`.
+
+    Reconectare automată cu back-off exponențial și jitter; cât timp fluxul
+    este conectat, interogarea periodică rulează doar la intervalul maxim.
+    """
+
+    def __init__(self, coordinator, session: ClientSession, url):
+        """Inițializează transportul."""
+        super().__init__(coordinator)
+        self._session = session
+        self._url = url
+        self._task = None
+        self._last_event_id = None
+        self._delay = STREAM_RECONNECT_MIN
+
+    def async_start(self, entry=None):
+        """Pornește bucla de conectare ca task de fundal (al config entry-ului, dacă există)."""
+        hass = self.coordinator.hass
+        name = f"{DOMAIN}_flux_sse"
+        if entry is None:
+            self._task = hass.async_create_background_task(self._async_run(), name)
+        else:
+            self._task = entry.async_create_background_task(hass, self._async_run(), name)
+
+    async def async_stop(self):
+        """Oprește bucla de conectare."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.coordinator.set_push_connected(False, refresh=False)
+
+    async def _async_run(self):
+        """Bucla de conectare: reconectare automată până la oprire."""
+        while True:
+            try:
+                await self._async_consume()
+                _LOGGER.debug("Fluxul SSE a fost închis de server.")
+            except (ClientError, asyncio.TimeoutError, UnicodeDecodeError) as err:
+                _LOGGER.debug("Fluxul SSE s-a întrerupt: %s", err)
+            except Exception:
+                # Ex. `ValueError("Line is too long")` din aiohttp sau o eroare în
+                # coordonator: bucla nu trebuie să se oprească definitiv
+                _LOGGER.exception("Eroare neașteptată în fluxul SSE, se reconectează.")
+            self.coordinator.set_push_connected(False)
+
+            delay = self._delay * random.uniform(0.8, 1.2)
+            self._delay = min(self._delay * 2, STREAM_RECONNECT_MAX)
+            _LOGGER.debug("Reconectare la fluxul SSE peste %.1f secunde.", delay)
+            await asyncio.sleep(delay)
+
+    async def _async_consume(self):
+        """Se conectează la flux și livrează evenimentele în coordonator."""
+        headers = {hdrs.ACCEPT: "text/event-stream", hdrs.CACHE_CONTROL: "no-cache"}
+        if self._last_event_id:
+            headers["Last-Event-ID"] = self._last_event_id
+
+        # Fără limită totală; serverul trebuie să trimită cel puțin un heartbeat
+        timeout = ClientTimeout(total=None, sock_connect=10, sock_read=STREAM_HEARTBEAT_TIMEOUT)
+        async with self._session.get(self._url, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            _LOGGER.debug("Conectat la fluxul SSE: %s", self._url)
+            self.coordinator.set_push_connected(True)
+
+            event_type = None
+            data_lines = []
+            async for raw_line in response.content:
+                # Back-off-ul revine la minim doar după o linie citită cu succes,
+                # astfel încât un flux care eșuează imediat nu se reconectează în buclă
+                self._delay = STREAM_RECONNECT_MIN
+                line = raw_line.decode("utf-8").rstrip("\r\n")
+                if not line:
+                    # Linie goală: sfârșitul unui eveniment
+                    if data_lines and event_type in (None, "message", "cutremur"):
+                        await self._async_dispatch("\n".join(data_lines))
+                    event_type = None
+                    data_lines = []
+                    continue
+                if line.startswith(":"):
+                    # Comentariu (heartbeat)
+                    continue
+                field, _, value = line.partition(":")
+                if value.startswith(" "):
+                    value = value[1:]
+                if field == "data":
+                    data_lines.append(value)
+                elif field == "event":
+                    event_type = value
+                elif field == "id":
+                    self._last_event_id = value
+                elif field == "retry" and value.isdigit():
+                    self._delay = max(STREAM_RECONNECT_MIN, int(value) / 1000)
+
+    async def _async_dispatch(self, data):
+        """Parsează un payload primit prin flux și îl publică în coordonator."""
+        try:
+            payload = parse_payload(json_loads(data))
+        except (ValueError, vol.Invalid) as err:
+            _LOGGER.warning("Payload invalid primit prin fluxul SSE: %s", err)
+            return
+        await self.coordinator.async_push_payload(payload)
+
+
+def create_transport(coordinator, session, settings):
+    """Creează transportul configurat (implicit: doar interogare periodică)."""
+    mode = settings.get("transport", TRANSPORT_POLLING)
+    stream_url = settings.get("stream_url")
+    if mode == TRANSPORT_SSE and stream_url:
+        return SseTransport(coordinator, session, stream_url)
+    return InfProTransport(coordinator)
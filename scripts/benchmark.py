@@ -0,0 +1,485 @@
+"""
+Benchmark pentru calea fetch → parse → fan-out a integrării INFP.
+
+Pornește un server aiohttp local care imită `URL_CUTREMUR` și servește
+payload-uri sintetice (1 … 10.000 de rânduri în `analiza_cutremur`) sau
+înregistrate (`--payload fisier.json`). Măsoară:
+
+- `fetch_200` / `fetch_304`: latența `InfProApiClient.async_fetch_data`;
+- `refresh`: o actualizare completă a coordonatorului (payload nou la fiecare cerere);
+- `entity_update`: actualizarea tuturor senzorilor `AnalizaDate`, per entitate;
+- `stream_push`: latența de la trimiterea unui eveniment prin fluxul SSE
+  până la notificarea ascultătorilor coordonatorului;
+- `multi_source`: interogarea paralelă INFP + EMSC + USGS (surse locale),
+  cu comasarea evenimentelor duplicate.
+
+Cu `--serve`, scriptul pornește doar serverul local (INFP, SSE, EMSC și
+USGS GeoJSON) și afișează URL-urile, pentru testarea manuală a integrării.
+
+Rezultatele sunt scrise ca JSON (o listă de măsurători). Cu `--compare` se
+compară cu o rulare anterioară, iar scriptul iese cu cod 1 dacă vreo
+măsurătoare este mai lentă decât pragul permis.
+
+Necesită un mediu de dezvoltare cu `homeassistant` instalat:
+
+    python scripts/benchmark.py --output bench.json
+    python scripts/benchmark.py --compare bench.json --threshold 1.25
+    python scripts/benchmark.py --serve
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from zoneinfo import ZoneInfo
+
+from aiohttp import ClientSession, web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.infpro.api import FetchCache, InfProApiClient  # noqa: E402
+from custom_components.infpro.coordinator import InfProDataUpdateCoordinator  # noqa: E402
+from custom_components.infpro.history import EventHistory  # noqa: E402
+from custom_components.infpro.orase import ORASE_BY_ID  # noqa: E402
+from custom_components.infpro.sensor import AnalizaDate  # noqa: E402
+from custom_components.infpro.sources import GeoJsonSource, MultiSourceClient  # noqa: E402
+from custom_components.infpro.transport import SseTransport  # noqa: E402
+
+PAYLOAD_ROWS = (1, 10, 100, 1000, 10000)
+ENTITY_COUNTS = (1, 10, 311)
+
+
+def synthetic_payload(rows, smevid=1):
+    """Construiește un payload sintetic cu `rows` rânduri în `analiza_cutremur`."""
+    orase = list(ORASE_BY_ID.items())
+    return {
+        "date_cutremur": {
+            "smevid": smevid,
+            "mag_ml": 4.1,
+            "mag_mw": 4.3,
+            "local_time": "2025-01-20 15:35:12",
+            "elat": 45.72,
+            "elon": 26.61,
+            "depth": 128.0,
+            "location": "VRANCEA",
+            "intensity": "IV",
+        },
+        "record_cutremur": {
+            "new_smevid": 1,
+            "new_mag_ml": 5.7,
+            "mag_mw": 5.8,
+            "local_time": "2024-02-04 10:00:00",
+            "elat": 45.6,
+            "elon": 26.5,
+            "depth": 140.0,
+            "location": "VRANCEA",
+            "intensity": "VI",
+        },
+        "analiza_cutremur": [
+            {
+                "oras_id": orase[i % len(orase)][0] if i < len(orase) else str(i + 1),
+                "oras": orase[i % len(orase)][1],
+                "judet": "VN",
+                "distanta_km": 100.0 + i % 400,
+                "pga": 0.012,
+                "pgv": 0.45,
+                "intensitate": "III",
+                "iacc": 2.8,
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def geojson_feed(payload, style):
+    """
+    Fluxul GeoJSON (stil EMSC sau USGS) cu același cutremur ca `date_cutremur`,
+    raportat cu mici diferențe de timp și poziție, plus un eveniment mai vechi.
+    """
+    event = payload["date_cutremur"]
+    moment = datetime.fromisoformat(event["local_time"]).replace(
+        tzinfo=ZoneInfo("Europe/Bucharest")
+    )
+    reports = [
+        (f"{event['smevid']}", moment + timedelta(seconds=4), event["elat"] + 0.03, event["mag_ml"]),
+        (f"{event['smevid']}-vechi", moment - timedelta(hours=6), 45.1, 2.4),
+    ]
+    features = []
+    for event_id, when, lat, magnitude in reports:
+        if style == "emsc":
+            properties = {
+                "unid": f"emsc{event_id}",
+                "time": when.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "lat": lat,
+                "lon": event["elon"],
+                "depth": event["depth"],
+                "mag": magnitude,
+                "magtype": "ml",
+                "flynn_region": "ROMANIA",
+            }
+            coordinates = [event["elon"], lat, -event["depth"]]
+        else:
+            properties = {
+                "time": int(when.timestamp() * 1000),
+                "mag": magnitude,
+                "magType": "mb",
+                "place": "Vrancea, Romania",
+            }
+            coordinates = [event["elon"], lat, event["depth"]]
+        features.append({
+            "type": "Feature",
+            "id": f"us{event_id}",
+            "geometry": {"type": "Point", "coordinates": coordinates},
+            "properties": properties,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def api_client(session, url):
+    """Client API fără refolosirea payload-ului în memorie: fiecare apel ajunge la server."""
+    return InfProApiClient(session, url, FetchCache(session, ttl=0))
+
+
+class FakeInfpServer:
+    """Server local care servește payload-ul curent, cu ETag și răspuns 304."""
+
+    def __init__(self):
+        """Inițializează serverul."""
+        self.body = b"{}"
+        self.etag = '""'
+        self.changing = False
+        self._smevid = 0
+        self._rows = 1
+        self._runner = None
+        self._streams = set()
+        self.stream_connected = asyncio.Event()
+        self.url = None
+        self.stream_url = None
+        self.emsc_url = None
+        self.usgs_url = None
+        self.payload = {}
+
+    def set_payload(self, payload, rows=None):
+        """Setează payload-ul servit."""
+        self.payload = payload
+        self.body = json.dumps(payload).encode()
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        if rows is not None:
+            self._rows = rows
+
+    async def _handle(self, request):
+        if self.changing:
+            # Fiecare cerere primește un eveniment nou (smevid diferit)
+            self._smevid += 1
+            self.set_payload(synthetic_payload(self._rows, self._smevid))
+        elif request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.Response(
+            body=self.body,
+            content_type="application/json",
+            headers={"ETag": self.etag},
+        )
+
+    async def _handle_emsc(self, request):
+        return web.json_response(geojson_feed(self.payload, "emsc"))
+
+    async def _handle_usgs(self, request):
+        return web.json_response(geojson_feed(self.payload, "usgs"))
+
+    async def _handle_stream(self, request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": conectat\n\n")
+        self._streams.add(response)
+        self.stream_connected.set()
+        try:
+            # Conexiunea rămâne deschisă până la oprirea serverului
+            await asyncio.Event().wait()
+        finally:
+            self._streams.discard(response)
+        return response
+
+    async def push(self, payload):
+        """Trimite un payload tuturor clienților conectați la fluxul SSE."""
+        message = b"data: " + json.dumps(payload).encode() + b"\n\n"
+        for response in list(self._streams):
+            try:
+                await response.write(message)
+            except ConnectionError:
+                # Client deconectat (ex. dintr-o rulare anterioară); handler-ul
+                # fluxului poate să-l fi eliminat deja
+                self._streams.discard(response)
+
+    async def start(self):
+        """Pornește serverul pe un port liber."""
+        app = web.Application()
+        app.router.add_get("/homeassistant/date_api.json", self._handle)
+        app.router.add_get("/homeassistant/stream", self._handle_stream)
+        app.router.add_get("/fdsnws/event/1/query", self._handle_emsc)
+        app.router.add_get("/earthquakes/feed/v1.0/summary/all_hour.geojson", self._handle_usgs)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/homeassistant/date_api.json"
+        self.stream_url = f"http://127.0.0.1:{port}/homeassistant/stream"
+        self.emsc_url = f"http://127.0.0.1:{port}/fdsnws/event/1/query?format=json"
+        self.usgs_url = (
+            f"http://127.0.0.1:{port}/earthquakes/feed/v1.0/summary/all_hour.geojson"
+        )
+
+    async def stop(self):
+        """Oprește serverul."""
+        await self._runner.cleanup()
+
+
+def summarize(name, samples, **params):
+    """Rezumatul unei serii de măsurători, în microsecunde."""
+    samples = sorted(samples)
+    return {
+        "benchmark": name,
+        **params,
+        "n": len(samples),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6, 2),
+        "min_us": round(samples[0] * 1e6, 2),
+    }
+
+
+async def bench_fetch(server, session, rows, repeat):
+    """Latența clientului API pentru răspunsuri 200 și 304."""
+    client = api_client(session, server.url)
+    results = []
+    for name, conditional in (("fetch_200", False), ("fetch_304", True)):
+        samples = []
+        await client.async_fetch_data()
+        for _ in range(repeat):
+            if not conditional:
+                client.restore_validators()
+            start = time.perf_counter()
+            await client.async_fetch_data()
+            samples.append(time.perf_counter() - start)
+        results.append(summarize(name, samples, payload_rows=rows))
+    return results
+
+
+async def bench_refresh(hass, server, session, rows, repeat):
+    """Durata unei actualizări complete a coordonatorului, cu payload nou."""
+    history = EventHistory(hass, path=os.path.join(hass.config.config_dir, "istoric.jsonl"))
+    coordinator = InfProDataUpdateCoordinator(
+        hass, update_interval=30, api=api_client(session, server.url), history=history
+    )
+    server.changing = True
+    samples = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            samples.append(time.perf_counter() - start)
+    finally:
+        server.changing = False
+        await coordinator.async_shutdown()
+    return summarize("refresh", samples, payload_rows=rows)
+
+
+async def bench_entities(hass, server, session, rows, entities, repeat):
+    """Costul actualizării senzorilor `AnalizaDate`, raportat per entitate."""
+    coordinator = InfProDataUpdateCoordinator(
+        hass, update_interval=30, api=api_client(session, server.url)
+    )
+    await coordinator.async_refresh()
+
+    sensors = []
+    for oras_id, oras_nume in list(ORASE_BY_ID.items())[:entities]:
+        sensor = AnalizaDate(coordinator, oras_id, oras_nume)
+        sensor.hass = hass
+        sensor.entity_id = f"sensor.bench_analiza_{oras_id}"
+        # Se măsoară calculul stării, fără scrierea în mașina de stări
+        sensor.async_write_ha_state = lambda: None
+        sensors.append(sensor)
+
+    samples = []
+    for _ in range(repeat):
+        # Forțăm recalcularea completă la fiecare iterație
+        for sensor in sensors:
+            sensor._attributes = {}
+        start = time.perf_counter()
+        for sensor in sensors:
+            sensor._async_update_from_coordinator()
+        samples.append((time.perf_counter() - start) / len(sensors))
+
+    await coordinator.async_shutdown()
+    return summarize("entity_update", samples, payload_rows=rows, entities=len(sensors))
+
+
+async def bench_stream(hass, server, session, rows, repeat):
+    """Latența livrării prin fluxul SSE, până la ascultătorii coordonatorului."""
+    coordinator = InfProDataUpdateCoordinator(
+        hass, update_interval=30, api=api_client(session, server.url)
+    )
+    await coordinator.async_refresh()
+    received = asyncio.Event()
+    remove_listener = coordinator.async_add_listener(received.set)
+
+    transport = SseTransport(coordinator, session, server.stream_url)
+    server.stream_connected.clear()
+    transport.async_start()
+    await server.stream_connected.wait()
+
+    samples = []
+    try:
+        for smevid in range(1000, 1000 + repeat):
+            received.clear()
+            start = time.perf_counter()
+            await server.push(synthetic_payload(rows, smevid))
+            await asyncio.wait_for(received.wait(), 10)
+            samples.append(time.perf_counter() - start)
+    finally:
+        remove_listener()
+        await transport.async_stop()
+        await coordinator.async_shutdown()
+    return summarize("stream_push", samples, payload_rows=rows)
+
+
+async def bench_multi_source(server, session, rows, repeat):
+    """Interogarea paralelă a surselor locale (INFP, EMSC, USGS), cu payload nou."""
+    client = MultiSourceClient(
+        api_client(session, server.url),
+        [
+            GeoJsonSource(session, server.emsc_url, "emsc"),
+            GeoJsonSource(session, server.usgs_url, "usgs"),
+        ],
+    )
+    server.changing = True
+    samples = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await client.async_fetch_data()
+            samples.append(time.perf_counter() - start)
+    finally:
+        server.changing = False
+    return summarize("multi_source", samples, payload_rows=rows)
+
+
+async def serve():
+    """Pornește doar serverul local, până la întrerupere (Ctrl+C)."""
+    server = FakeInfpServer()
+    server.set_payload(synthetic_payload(10), 10)
+    await server.start()
+    print(f"INFP:  {server.url}")
+    print(f"SSE:   {server.stream_url}")
+    print(f"EMSC:  {server.emsc_url}")
+    print(f"USGS:  {server.usgs_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def load_payloads(args):
+    """Payload-urile măsurate: cele sintetice și cele înregistrate (citite înainte de buclă)."""
+    payloads = [(rows, synthetic_payload(rows)) for rows in args.rows]
+    for path in args.payload:
+        with open(path, encoding="utf-8") as file:
+            recorded = json.load(file)
+        payloads.append((len(recorded.get("analiza_cutremur") or []), recorded))
+    return payloads
+
+
+async def run(args, payloads):
+    """Rulează toate măsurătorile și returnează rezultatele."""
+    server = FakeInfpServer()
+    await server.start()
+    results = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            async with ClientSession() as session:
+                for rows, payload in payloads:
+                    server.set_payload(payload, rows)
+                    results.extend(await bench_fetch(server, session, rows, args.repeat))
+                    results.append(await bench_refresh(hass, server, session, rows, args.repeat))
+                    server.set_payload(payload, rows)
+                    results.append(await bench_stream(hass, server, session, rows, args.repeat))
+                    server.set_payload(payload, rows)
+                    results.append(
+                        await bench_multi_source(server, session, rows, args.repeat)
+                    )
+                    for entities in args.entities:
+                        results.append(
+                            await bench_entities(
+                                hass, server, session, rows, entities, args.repeat
+                            )
+                        )
+        finally:
+            await hass.async_stop(force=True)
+            await server.stop()
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Compară cu o rulare anterioară; returnează lista regresiilor."""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    def key(item):
+        return (item["benchmark"], item.get("payload_rows"), item.get("entities"))
+
+    previous = {key(item): item for item in baseline}
+    regressions = []
+    for item in results:
+        old = previous.get(key(item))
+        if old and item["p50_us"] > old["p50_us"] * threshold:
+            regressions.append(
+                f"{key(item)}: p50 {old['p50_us']}us -> {item['p50_us']}us"
+            )
+    return regressions
+
+
+def main():
+    """Punctul de intrare."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="*", default=list(PAYLOAD_ROWS))
+    parser.add_argument("--entities", type=int, nargs="*", default=list(ENTITY_COUNTS))
+    parser.add_argument("--payload", nargs="*", default=[], help="payload-uri înregistrate")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="fișierul JSON cu rezultatele")
+    parser.add_argument("--compare", help="rezultatele unei rulări anterioare")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--serve", action="store_true", help="doar serverul local")
+    args = parser.parse_args()
+
+    if args.serve:
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    results = asyncio.run(run(args, load_payloads(args)))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESIE {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
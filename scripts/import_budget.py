@@ -0,0 +1,132 @@
+"""
+Verifică bugetul de timp la importul modulelor integrării INFP.
+
+Pentru fiecare modul încărcat de Home Assistant la pornire (pachetul,
+platformele și config flow-ul) rulează un interpretor nou cu
+`python -X importtime` și adună timpii proprii ai modulelor
+`custom_components.infpro*`. Dependențele externe (`homeassistant`,
+`aiohttp`) sunt excluse, fiind încărcate oricum de Home Assistant.
+
+Scriptul iese cu cod 1 dacă vreun modul depășește bugetul sau dacă
+tabelele orașelor (`orase`), modulele serviciilor (`backfill`, `replay`)
+ori componentele opționale (`sources`, `transport`, `impact`) sunt
+încărcate la import.
+
+Opțional, durata configurării (`durata_configurare_s`) dintr-un fișier de
+diagnostic descărcat din Home Assistant este comparată cu bugetul de
+configurare (implicit 5 secunde, ca `SETUP_TIME_BUDGET` din const.py).
+
+Necesită un mediu de dezvoltare cu `homeassistant` instalat:
+
+    python scripts/import_budget.py
+    python scripts/import_budget.py --budget-ms 30 --repeat 5
+    python scripts/import_budget.py --diagnostics diagnostic.json --setup-budget-s 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+PACKAGE = "custom_components.infpro"
+
+# Modulele importate de Home Assistant la configurarea integrării
+MODULES = (
+    PACKAGE,
+    f"{PACKAGE}.sensor",
+    f"{PACKAGE}.binary_sensor",
+    f"{PACKAGE}.config_flow",
+)
+
+# Modulele care trebuie încărcate doar la prima folosire (tabelele orașelor,
+# serviciile) sau doar dacă setările le cer (surse, flux SSE, puncte de impact)
+LAZY_MODULES = (
+    f"{PACKAGE}.orase",
+    f"{PACKAGE}.backfill",
+    f"{PACKAGE}.replay",
+    f"{PACKAGE}.sources",
+    f"{PACKAGE}.transport",
+    f"{PACKAGE}.impact",
+)
+
+
+def measure(module):
+    """
+    Importă modulul într-un interpretor nou.
+
+    :return: (timpul propriu cumulat al modulelor integrării în ms, modulele încărcate)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <nume modul>"
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if name == PACKAGE or name.startswith(f"{PACKAGE}."):
+            total_us += int(parts[0])
+            loaded.add(name)
+    return total_us / 1000, loaded
+
+
+def setup_seconds(path):
+    """Durata configurării din fișierul de diagnostic (formatul descărcat sau doar secțiunea integrării)."""
+    with open(path, encoding="utf-8") as file:
+        document = json.load(file)
+    data = document.get("data", document)
+    return data["metrics"]["durata_configurare_s"]
+
+
+def main():
+    """Punctul de intrare."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--diagnostics", help="fișier de diagnostic descărcat din Home Assistant")
+    parser.add_argument("--setup-budget-s", type=float, default=5.0)
+    args = parser.parse_args()
+
+    failures = []
+    for module in MODULES:
+        samples = []
+        loaded = set()
+        for _ in range(args.repeat):
+            elapsed, loaded = measure(module)
+            samples.append(elapsed)
+        median = statistics.median(samples)
+        print(f"{module}: {median:.1f} ms ({len(loaded)} module)")
+
+        if median > args.budget_ms:
+            failures.append(f"{module}: {median:.1f} ms > {args.budget_ms:.1f} ms")
+        for lazy in LAZY_MODULES:
+            if lazy in loaded:
+                failures.append(f"{module}: {lazy} este încărcat la import")
+
+    if args.diagnostics:
+        seconds = setup_seconds(args.diagnostics)
+        if seconds is None:
+            failures.append("durata configurării lipsește din fișierul de diagnostic")
+        else:
+            print(f"configurare: {seconds:.3f} s")
+            if seconds > args.setup_budget_s:
+                failures.append(f"configurare: {seconds:.3f} s > {args.setup_budget_s:.3f} s")
+
+    for line in failures:
+        print(f"DEPĂȘIRE {line}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()